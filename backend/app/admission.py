@@ -0,0 +1,195 @@
+import asyncio
+import json
+import math
+import os
+import re
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL_ENABLED", "true").lower() == "true"
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "10"))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "5"))
+ADMISSION_MAX_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_MAX_RETRY_AFTER_SECONDS", "60"))
+
+# (class name, HTTP method, path pattern). Only the LLM-bound and rendering routes are
+# limited; everything else bypasses admission entirely.
+ROUTE_CLASSES: List[Tuple[str, str, "re.Pattern[str]"]] = [
+    ("generate", "POST", re.compile(r"^/api/documents/generate/?$")),
+    ("refinement", "POST", re.compile(r"^/api/refinement(/|/bulk/?)$")),
+    ("export", "GET", re.compile(r"^/api/documents/\d+/export/?$")),
+]
+
+# Per-worker defaults: concurrency, queue length
+_DEFAULT_LIMITS = {"generate": (4, 8), "refinement": (8, 16), "export": (4, 8)}
+
+_RECENT_WAITS = 1000
+
+
+def _limit(route_class: str, kind: str, default: int) -> int:
+    return int(os.getenv(f"ADMISSION_{route_class.upper()}_{kind}", str(default)))
+
+
+class RouteClassLimiter:
+    """
+    At most ``concurrency`` requests of one class run at a time and at most ``queue_size``
+    wait for a slot. A request that finds the queue full, or waits longer than
+    ``queue_timeout`` seconds, is turned away instead of tying up a worker thread.
+    """
+
+    def __init__(self, name: str, concurrency: int, queue_size: int, queue_timeout: float) -> None:
+        self.name = name
+        self.concurrency = max(concurrency, 1)
+        self.queue_size = max(queue_size, 0)
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.max_queue_ms = 0.0
+        self._total_queue_ms = 0.0
+        self._recent_waits = deque(maxlen=_RECENT_WAITS)
+        self._avg_service_seconds: Optional[float] = None
+
+    async def acquire(self) -> Optional[float]:
+        """Wait for a slot; returns the time spent queued in ms, or None if rejected."""
+        if self.in_flight >= self.concurrency and self.queued >= self.queue_size:
+            self.rejected_queue_full += 1
+            return None
+        self.queued += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            return None
+        finally:
+            self.queued -= 1
+        waited_ms = (time.perf_counter() - started) * 1000
+        self.in_flight += 1
+        self.admitted += 1
+        self._total_queue_ms += waited_ms
+        self.max_queue_ms = max(self.max_queue_ms, waited_ms)
+        self._recent_waits.append(waited_ms)
+        return waited_ms
+
+    def release(self, service_seconds: float) -> None:
+        self.in_flight -= 1
+        self._slots.release()
+        if self._avg_service_seconds is None:
+            self._avg_service_seconds = service_seconds
+        else:
+            self._avg_service_seconds = 0.8 * self._avg_service_seconds + 0.2 * service_seconds
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained, from the recent service time."""
+        if self._avg_service_seconds is None:
+            return ADMISSION_RETRY_AFTER_SECONDS
+        backlog = self.in_flight + self.queued + 1
+        estimate = math.ceil(self._avg_service_seconds * backlog / self.concurrency)
+        return min(max(estimate, 1), ADMISSION_MAX_RETRY_AFTER_SECONDS)
+
+    def stats(self) -> dict:
+        waits = sorted(self._recent_waits)
+
+        def _percentile(fraction: float) -> float:
+            return round(waits[min(int(fraction * len(waits)), len(waits) - 1)], 2) if waits else 0.0
+
+        return {
+            "route_class": self.name,
+            "concurrency": self.concurrency,
+            "queue_size": self.queue_size,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "avg_queue_ms": round(self._total_queue_ms / self.admitted, 2) if self.admitted else 0.0,
+            "p50_queue_ms": _percentile(0.5),
+            "p95_queue_ms": _percentile(0.95),
+            "max_queue_ms": round(self.max_queue_ms, 2),
+            "avg_service_ms": round((self._avg_service_seconds or 0.0) * 1000, 2),
+        }
+
+
+def build_limiters() -> Dict[str, RouteClassLimiter]:
+    return {
+        name: RouteClassLimiter(
+            name,
+            _limit(name, "CONCURRENCY", concurrency),
+            _limit(name, "QUEUE", queue_size),
+            ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        )
+        for name, (concurrency, queue_size) in _DEFAULT_LIMITS.items()
+    }
+
+
+limiters = build_limiters()
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    for name, route_method, pattern in ROUTE_CLASSES:
+        if method == route_method and pattern.match(path):
+            return name
+    return None
+
+
+def admission_stats() -> List[dict]:
+    return [limiter.stats() for limiter in limiters.values()]
+
+
+class AdmissionControlMiddleware:
+    """
+    Plain ASGI middleware, so streamed responses (bulk refinement) keep their slot until
+    the last chunk is sent and cheap routes pass through with one regex check. Sync
+    endpoints share one threadpool; capping the expensive classes keeps threads free for
+    everything else.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        route_class = classify(scope.get("method", ""), scope.get("path", "")) if scope["type"] == "http" else None
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = limiters[route_class]
+        waited_ms = await limiter.acquire()
+        if waited_ms is None:
+            await _reject(send, limiter)
+            return
+
+        async def send_with_queue_time(message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-queue-time-ms", f"{waited_ms:.1f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_queue_time)
+        finally:
+            limiter.release(time.perf_counter() - started)
+
+
+async def _reject(send, limiter: RouteClassLimiter) -> None:
+    body = json.dumps(
+        {"detail": f"The server is busy with {limiter.name} requests. Please retry shortly."}
+    ).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(limiter.retry_after()).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -23,3 +23,70 @@ def get_db():
     finally:
         db.close()
 
+def _add_missing_columns():
+    """
+    create_all never alters existing tables, so columns added to a model later are added
+    here. Only nullable columns or columns with a scalar default are supported.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+                if column.default is not None and column.default.is_scalar:
+                    ddl += f" NOT NULL DEFAULT {column.default.arg!r}"
+                conn.execute(text(ddl))
+
+def _enable_sqlite_autoincrement():
+    """
+    SQLite cannot add AUTOINCREMENT to an existing table, so tables declared with
+    ``sqlite_autoincrement`` but created without it are rebuilt once, keeping their rows.
+    Returns the names of the rebuilt tables.
+    """
+    from sqlalchemy.schema import CreateTable
+
+    if engine.dialect.name != "sqlite":
+        return []
+    rebuilt = []
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not table.dialect_options["sqlite"]["autoincrement"]:
+                continue
+            ddl = conn.execute(
+                text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": table.name}
+            ).scalar()
+            if ddl is None or "AUTOINCREMENT" in ddl.upper():
+                continue
+            staging = f"{table.name}_rebuild"
+            create = str(CreateTable(table).compile(dialect=engine.dialect))
+            conn.execute(text(create.replace(f"CREATE TABLE {table.name} ", f"CREATE TABLE {staging} ", 1)))
+            columns = ", ".join(column.name for column in table.columns)
+            conn.execute(text(f"INSERT INTO {staging} ({columns}) SELECT {columns} FROM {table.name}"))
+            conn.execute(text(f"DROP TABLE {table.name}"))
+            conn.execute(text(f"ALTER TABLE {staging} RENAME TO {table.name}"))
+            for index in table.indexes:
+                index.create(conn)
+            rebuilt.append(table.name)
+    return rebuilt
+
+def init_db():
+    """Create missing tables and columns. Run at application startup or via ``python -m app.database``."""
+    from app import models  # noqa: F401  (registers the tables on Base.metadata)
+    from app.services.archive import reserve_archived_ids
+    from app.services.search_index import ensure_search_index
+
+    Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    rebuilt = _enable_sqlite_autoincrement()
+    if rebuilt:
+        # Archived ids above the rows that were copied would otherwise still be handed out
+        reserve_archived_ids(engine, rebuilt)
+    ensure_search_index(engine)
+
+if __name__ == "__main__":
+    init_db()
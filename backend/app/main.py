@@ -1,19 +1,51 @@
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine, Base
-from app import models
-from app.routers import auth, projects, documents, refinement
+from app.database import init_db
+from app.admission import ADMISSION_CONTROL_ENABLED, AdmissionControlMiddleware
+from app.routers import auth, projects, documents, refinement, usage, profiler, search, precompute, archive, admission
+from app.services import archive as project_archive, outline_precompute
+from app.services.profiler import ProfilingMiddleware
+from app.services.usage_tracker import get_usage_recorder
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema setup happens once per worker at startup rather than as an import side effect
+    if os.getenv("INIT_DB_ON_STARTUP", "true").lower() == "true":
+        init_db()
+    scheduler = None
+    if outline_precompute.PRECOMPUTE_ENABLED:
+        scheduler = outline_precompute.PrecomputeScheduler()
+        scheduler.start()
+    archiver = None
+    if project_archive.ARCHIVE_ENABLED:
+        archiver = project_archive.ArchiveScheduler()
+        archiver.start()
+    yield
+    if scheduler is not None:
+        scheduler.shutdown()
+    if archiver is not None:
+        archiver.shutdown()
+    outline_precompute.get_popularity_recorder().shutdown()
+    get_usage_recorder().shutdown()
 
 app = FastAPI(
     title="AI Document Platform API",
     description="API for AI-powered document generation and refinement",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
+# Request-level profiling hook (idle unless an admin starts a session). Added first so it
+# is the innermost middleware and profiles exclude admission queue time.
+app.add_middleware(ProfilingMiddleware)
+
+# Admission control for the expensive routes. Added before CORS so that CORS wraps it and
+# early 503 responses still carry the CORS headers the browser needs to read them.
+if ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware)
+
 # CORS middleware
 frontend_origin = os.getenv("FRONTEND_URL", "http://localhost:3000")
 # Allow all localhost ports for development
@@ -43,6 +75,12 @@ app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(projects.router, prefix="/api/projects", tags=["projects"])
 app.include_router(documents.router, prefix="/api/documents", tags=["documents"])
 app.include_router(refinement.router, prefix="/api/refinement", tags=["refinement"])
+app.include_router(search.router, prefix="/api/search", tags=["search"])
+app.include_router(usage.router, prefix="/api/usage", tags=["usage"])
+app.include_router(profiler.router, prefix="/api/admin/profiler", tags=["admin"])
+app.include_router(precompute.router, prefix="/api/admin/precompute", tags=["admin"])
+app.include_router(archive.router, prefix="/api/admin/archive", tags=["admin"])
+app.include_router(admission.router, prefix="/api/admin/admission", tags=["admin"])
 
 @app.get("/")
 async def root():
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Boolean, UniqueConstraint, LargeBinary
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -24,12 +24,19 @@ class Project(Base):
     main_topic = Column(Text, nullable=False)
     outline = Column(JSON, nullable=True)  # For docx: list of section headers
     slides = Column(JSON, nullable=True)  # For pptx: list of slide titles
+    version = Column(Integer, nullable=False, default=1)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    archived_at = Column(DateTime(timezone=True), nullable=True)  # Sections and refinements live in project_archives
+    
+    # Every ORM UPDATE becomes "... WHERE version = <loaded version>" and bumps it, so a
+    # write based on a stale read raises StaleDataError instead of overwriting
+    __mapper_args__ = {"version_id_col": version}
     
     owner = relationship("User", back_populates="projects")
     sections = relationship("Section", back_populates="project", cascade="all, delete-orphan")
     refinements = relationship("Refinement", back_populates="project", cascade="all, delete-orphan")
+    archive = relationship("ProjectArchive", uselist=False, cascade="all, delete-orphan")
 
 class Section(Base):
     __tablename__ = "sections"
@@ -40,9 +47,16 @@ class Section(Base):
     title = Column(String, nullable=False)
     content = Column(Text, nullable=True)
     order_index = Column(Integer, nullable=False)
+    generation_fingerprint = Column(String, nullable=True)  # Hash of the inputs the content was generated from
+    version = Column(Integer, nullable=False, default=1)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    __mapper_args__ = {"version_id_col": version}
+    # Archived rows are restored with their original ids, so SQLite must never hand the
+    # ids of deleted rows to new ones
+    __table_args__ = {"sqlite_autoincrement": True}
+    
     project = relationship("Project", back_populates="sections")
     refinements = relationship("Refinement", back_populates="section", cascade="all, delete-orphan")
 
@@ -59,6 +73,49 @@ class Refinement(Base):
     user_comment = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
+    __table_args__ = {"sqlite_autoincrement": True}
+    
     project = relationship("Project", back_populates="refinements")
     section = relationship("Section", back_populates="refinements")
 
+
+class LLMUsage(Base):
+    __tablename__ = "llm_usage"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="SET NULL"), nullable=True, index=True)
+    operation = Column(String, nullable=False)  # "suggest_outline", "generate_section_content", "refine_content"
+    model = Column(String, nullable=False)
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    total_tokens = Column(Integer, nullable=False, default=0)
+    latency_ms = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class OutlineSuggestion(Base):
+    __tablename__ = "outline_suggestions"
+    __table_args__ = (UniqueConstraint("document_type", "topic_key"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    document_type = Column(String, nullable=False)
+    topic_key = Column(String, nullable=False)  # Lowercased, whitespace-collapsed main_topic
+    main_topic = Column(Text, nullable=False)  # Most recent spelling, used when refreshing
+    outline = Column(JSON, nullable=True)
+    request_count = Column(Integer, nullable=False, default=0)
+    last_requested_at = Column(DateTime(timezone=True), nullable=True)
+    refreshed_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class ProjectArchive(Base):
+    __tablename__ = "project_archives"
+    
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    codec = Column(String, nullable=False)  # "zlib" or "zstd"
+    payload = Column(LargeBinary, nullable=False)  # Compressed JSON of the project's sections and refinements
+    section_ids = Column(JSON, nullable=False)  # Lets section/refinement lookups find an archived row cheaply
+    refinement_ids = Column(JSON, nullable=False)
+    raw_bytes = Column(Integer, nullable=False)
+    stored_bytes = Column(Integer, nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
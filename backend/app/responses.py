@@ -0,0 +1,33 @@
+import gzip
+import os
+from typing import Iterable, List
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from app import schemas
+
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "8192"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "1"))
+
+# Built once at import; each adapter validates and serializes a whole list in one
+# pydantic-core call instead of one model per row.
+section_list_adapter = TypeAdapter(List[schemas.SectionResponse])
+refinement_list_adapter = TypeAdapter(List[schemas.RefinementResponse])
+
+
+def response_columns(model, schema) -> list:
+    """ORM columns matching ``schema``'s fields, for ``select()`` queries that skip ORM objects."""
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def compact_json_response(request: Request, adapter: TypeAdapter, rows: Iterable) -> Response:
+    """
+    Validate ``rows`` (dicts or row mappings) once, serialize straight to JSON bytes in
+    pydantic-core, and gzip the body when it is large and the client accepts it.
+    """
+    body = adapter.dump_json(adapter.validate_python(rows))
+    headers = {}
+    if len(body) >= GZIP_MINIMUM_SIZE and "gzip" in request.headers.get("accept-encoding", ""):
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+        headers = {"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+    return Response(content=body, media_type="application/json", headers=headers)
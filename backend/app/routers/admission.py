@@ -0,0 +1,12 @@
+from typing import List
+from fastapi import APIRouter, Depends
+from app import models, schemas, auth as auth_utils
+from app.admission import admission_stats
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[schemas.AdmissionClassStats])
+def get_admission_stats(current_user: models.User = Depends(auth_utils.get_current_admin_user)):
+    """Per-route-class load and queue-time metrics for this worker process."""
+    return admission_stats()
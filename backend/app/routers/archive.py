@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app import models, schemas, auth as auth_utils
+from app.database import get_db
+from app.services import archive
+
+router = APIRouter()
+
+
+@router.get("/stats", response_model=schemas.ArchiveStats)
+def get_archive_stats(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth_utils.get_current_admin_user),
+):
+    return archive.archive_stats(db)
+
+
+@router.post("/run", response_model=schemas.ArchiveStats)
+def run_archive(
+    request: schemas.ArchiveRunRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth_utils.get_current_admin_user),
+):
+    inactive_days = request.inactive_days if request.inactive_days is not None else archive.ARCHIVE_INACTIVE_DAYS
+    return archive.archive_inactive_projects(db, inactive_days, request.limit or archive.ARCHIVE_BATCH_SIZE)
+
+
+@router.post("/projects/{project_id}/restore", response_model=schemas.ProjectResponse)
+def restore_project(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth_utils.get_current_admin_user),
+):
+    project = db.get(models.Project, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return archive.ensure_restored(db, project)
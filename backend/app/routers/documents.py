@@ -1,14 +1,24 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import update
 from sqlalchemy.orm import Session
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response
 from app import models, schemas, auth as auth_utils
 from app.database import get_db
-from app.services.ai_service import get_ai_service
-from app.services import document_builder
+from app.services.ai_service import LLM_MAX_CONCURRENCY, get_ai_service
+from app.services import archive, document_builder, outline_precompute, search_index
+from app.services.shared_state import get_shared_state
 
 router = APIRouter()
 
+OUTLINE_CACHE_TTL_SECONDS = int(os.getenv("OUTLINE_CACHE_TTL_SECONDS", "86400"))
+
+
+def _outline_cache_key(document_type: str, main_topic: str) -> str:
+    return f"outline:{document_type}:{outline_precompute.topic_key(main_topic)}"
+
 
 def _get_project(db: Session, project_id: int, user_id: int) -> models.Project:
     project = (
@@ -18,16 +28,47 @@ def _get_project(db: Session, project_id: int, user_id: int) -> models.Project:
     )
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    return project
+    return archive.ensure_restored(db, project)
+
+
+def _current_sections(db: Session, project_id: int) -> List[models.Section]:
+    """Fresh read of the project's sections; rows deleted meanwhile are simply absent."""
+    return (
+        db.query(models.Section)
+        .filter(models.Section.project_id == project_id)
+        .order_by(models.Section.order_index.asc())
+        .populate_existing()
+        .all()
+    )
 
 
 @router.post("/template", response_model=schemas.AITemplateResponse)
 def ai_template_suggestion(
     request: schemas.AITemplateRequest,
+    db: Session = Depends(get_db),
     current_user: models.User = Depends(auth_utils.get_current_user),
 ):
-    ai_client = get_ai_service()
-    headings = ai_client.suggest_outline(request.document_type, request.main_topic)
+    # Imported here so that NumPy is only loaded once outline suggestions are requested
+    from app.services.semantic_cache import get_semantic_cache
+
+    outline_precompute.get_popularity_recorder().record(request.document_type, request.main_topic)
+    cache = get_shared_state()
+    cache_key = _outline_cache_key(request.document_type, request.main_topic)
+    headings = cache.get(cache_key)
+    if headings is None:
+        # Precomputed (or previously generated) outlines outlive the shared cache's TTL
+        headings = outline_precompute.get_stored_outline(db, request.document_type, request.main_topic)
+        if headings is None:
+            semantic_cache = get_semantic_cache()
+            headings = semantic_cache.lookup(request.document_type, request.main_topic)
+            if headings is None:
+                ai_client = get_ai_service()
+                headings = ai_client.suggest_outline(
+                    request.document_type, request.main_topic, user_id=current_user.id
+                )
+                semantic_cache.store(request.document_type, request.main_topic, headings)
+                outline_precompute.store_outline(db, request.document_type, request.main_topic, headings)
+        cache.set(cache_key, headings, ttl=OUTLINE_CACHE_TTL_SECONDS)
     if request.document_type == "docx":
         return schemas.AITemplateResponse(outline=headings)
     return schemas.AITemplateResponse(slides=headings)
@@ -39,6 +80,8 @@ def generate_document_content(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth_utils.get_current_user),
 ):
+    if request.mode not in {"missing", "stale"}:
+        raise HTTPException(status_code=400, detail="mode must be missing or stale")
     project = _get_project(db, request.project_id, current_user.id)
     ai_client = get_ai_service()
 
@@ -68,17 +111,80 @@ def generate_document_content(
             .all()
         )
 
+    pending = []
     for section in sections:
-        if section.content:
+        fingerprint = ai_client.section_fingerprint(project.document_type, project.main_topic, section.title)
+        if section.content and (request.mode == "missing" or section.generation_fingerprint == fingerprint):
             continue
-        section.content = ai_client.generate_section_content(
-            document_type=project.document_type,
-            main_topic=project.main_topic,
-            section_title=section.title,
+        pending.append((section, fingerprint))
+
+    document_type, main_topic = project.document_type, project.main_topic
+    user_id, project_id = current_user.id, project.id
+
+    def _generate(section_title: str) -> str:
+        return ai_client.generate_section_content(
+            document_type=document_type,
+            main_topic=main_topic,
+            section_title=section_title,
+            user_id=user_id,
+            project_id=project_id,
         )
-        db.add(section)
+
+    # Sections are independent, so fan the LLM calls out. Worker threads only see plain
+    # strings; the rows are written on this thread once every call has finished. A failed
+    # call only costs its own section: the others are still stored.
+    expected_versions = {section.id: section.version for section, _ in pending}
+    stored_ids, conflicts, failed = [], [], []
+    if pending:
+        contents = {}
+        with ThreadPoolExecutor(max_workers=min(len(pending), LLM_MAX_CONCURRENCY)) as executor:
+            futures = {executor.submit(_generate, section.title): section.id for section, _ in pending}
+            for future in as_completed(futures):
+                try:
+                    contents[futures[future]] = future.result()
+                except Exception as exc:
+                    detail = exc.detail if isinstance(exc, HTTPException) else str(exc)
+                    failed.append({"section_id": futures[future], "detail": detail})
+        for section, fingerprint in pending:
+            if section.id not in contents:
+                continue
+            # Conditional per-row UPDATE: a section refined, regenerated or deleted while the
+            # LLM calls ran keeps its newer state, and only that section is reported.
+            updated = db.execute(
+                update(models.Section)
+                .where(models.Section.id == section.id, models.Section.version == expected_versions[section.id])
+                .values(
+                    content=contents[section.id],
+                    generation_fingerprint=fingerprint,
+                    version=models.Section.version + 1,
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if updated:
+                stored_ids.append(section.id)
+            else:
+                conflicts.append(section.id)
+    current = _current_sections(db, project.id)
+    search_index.index_sections(db, project, [section for section in current if section.id in stored_ids])
     db.commit()
-    return sections
+    if conflicts or failed:
+        if conflicts:
+            status_code, message = status.HTTP_409_CONFLICT, "Some sections were modified while content was being generated."
+        else:
+            status_code, message = status.HTTP_500_INTERNAL_SERVER_ERROR, "Content generation failed for some sections."
+        raise HTTPException(
+            status_code=status_code,
+            detail={
+                "message": message,
+                "conflicts": conflicts,
+                "failed": sorted(failed, key=lambda item: item["section_id"]),
+                "current": [
+                    schemas.SectionResponse.model_validate(section).model_dump(mode="json")
+                    for section in _current_sections(db, project.id)
+                ],
+            },
+        )
+    return _current_sections(db, project.id)
 
 
 @router.get("/{project_id}/export")
@@ -87,7 +193,7 @@ def export_document(
     format: str | None = Query(None, pattern="^(docx|pptx)$"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth_utils.get_current_user),
-) -> StreamingResponse:
+) -> Response:
     project = _get_project(db, project_id, current_user.id)
     export_format = format or project.document_type
     sections = (
@@ -0,0 +1,56 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from app import models, schemas, auth as auth_utils
+from app.database import get_db
+from app.services import outline_precompute
+
+router = APIRouter()
+
+
+@router.post("/run", response_model=schemas.PrecomputeRunStatus, status_code=status.HTTP_202_ACCEPTED)
+def run_precompute(
+    request: schemas.PrecomputeRunRequest,
+    current_user: models.User = Depends(auth_utils.get_current_admin_user),
+):
+    # Up to top_k LLM calls: run in the background and poll GET /run for the result
+    run = outline_precompute.start_refresh(
+        top_k=request.top_k or outline_precompute.PRECOMPUTE_TOP_K,
+        token_budget=request.token_budget or outline_precompute.PRECOMPUTE_TOKEN_BUDGET,
+    )
+    if run is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An outline precompute run is already in progress.",
+        )
+    return run
+
+
+@router.get("/run", response_model=schemas.PrecomputeRunStatus)
+def get_precompute_run(
+    current_user: models.User = Depends(auth_utils.get_current_admin_user),
+):
+    run = outline_precompute.last_run()
+    if run is None:
+        raise HTTPException(status_code=404, detail="No precompute run has been started")
+    return run
+
+
+@router.get("/topics", response_model=List[schemas.OutlineTopic])
+def list_popular_topics(
+    limit: int = Query(50, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth_utils.get_current_admin_user),
+):
+    outline_precompute.get_popularity_recorder().flush()
+    return [
+        schemas.OutlineTopic(
+            document_type=row.document_type,
+            main_topic=row.main_topic,
+            request_count=row.request_count,
+            last_requested_at=row.last_requested_at,
+            refreshed_at=row.refreshed_at,
+            precomputed=bool(row.outline),
+        )
+        for row in outline_precompute.popular_topics(db, limit)
+    ]
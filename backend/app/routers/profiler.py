@@ -0,0 +1,66 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from app import models, schemas, auth as auth_utils
+from app.services import profiler
+
+router = APIRouter()
+
+
+@router.post("/start", response_model=schemas.ProfilerStatus)
+def start_profiling(
+    request: schemas.ProfilerStartRequest,
+    current_user: models.User = Depends(auth_utils.get_current_admin_user),
+):
+    session = profiler.start_session(
+        routes=request.routes,
+        duration_seconds=request.duration_seconds,
+        max_requests=request.max_requests,
+        interval_ms=max(request.interval_ms, 1),
+        slow_request_ms=request.slow_request_ms,
+    )
+    return session.status()
+
+
+@router.get("/status", response_model=schemas.ProfilerStatus)
+def profiling_status(current_user: models.User = Depends(auth_utils.get_current_admin_user)):
+    return profiler.get_session().status()
+
+
+@router.post("/stop", response_model=schemas.ProfilerStatus)
+def stop_profiling(current_user: models.User = Depends(auth_utils.get_current_admin_user)):
+    session = profiler.get_session()
+    session.stop()
+    return session.status()
+
+
+@router.get("/result")
+def download_profile(
+    format: str = Query("speedscope", pattern="^(speedscope|collapsed)$"),
+    current_user: models.User = Depends(auth_utils.get_current_admin_user),
+):
+    session = profiler.get_session()
+    if format == "collapsed":
+        return PlainTextResponse(
+            session.collapsed(),
+            headers={"Content-Disposition": 'attachment; filename="profile.collapsed.txt"'},
+        )
+    return JSONResponse(
+        session.speedscope(),
+        headers={"Content-Disposition": 'attachment; filename="profile.speedscope.json"'},
+    )
+
+
+@router.get("/slow-requests/{index}")
+def download_slow_request(
+    index: int,
+    format: str = Query("prof", pattern="^(prof|text)$"),
+    current_user: models.User = Depends(auth_utils.get_current_admin_user),
+):
+    stats = profiler.get_slow_request_stats(profiler.get_session(), index)
+    if format == "text":
+        return PlainTextResponse(profiler.stats_to_text(stats))
+    return Response(
+        stats,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="slow-request-{index}.prof"'},
+    )
@@ -1,23 +1,50 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from app import models, schemas, auth as auth_utils
 from app.database import get_db
+from app.responses import compact_json_response, response_columns, section_list_adapter
+from app.services import archive, search_index
 
 router = APIRouter()
 
 
+def _project_conflict(db: Session, project_id: int) -> HTTPException:
+    # Re-read rather than reuse the (possibly expired) ORM object: the project may have
+    # been deleted meanwhile, in which case ``current`` is null.
+    current = (
+        db.query(models.Project).filter(models.Project.id == project_id).populate_existing().first()
+    )
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={
+            "message": "Project was modified by another request.",
+            "current": schemas.ProjectResponse.model_validate(current).model_dump(mode="json") if current else None,
+        },
+    )
+
+
 def _sync_sections(db: Session, project: models.Project, titles: List[str], section_type: str):
+    stale_ids = [
+        section_id
+        for (section_id,) in db.query(models.Section.id).filter(models.Section.project_id == project.id)
+    ]
     db.query(models.Section).filter(models.Section.project_id == project.id).delete()
-    for idx, title in enumerate(titles):
-        db.add(
-            models.Section(
-                project_id=project.id,
-                section_type=section_type,
-                title=title,
-                order_index=idx,
-            )
+    sections = [
+        models.Section(
+            project_id=project.id,
+            section_type=section_type,
+            title=title,
+            order_index=idx,
         )
+        for idx, title in enumerate(titles)
+    ]
+    db.add_all(sections)
+    db.flush()
+    search_index.remove_sections(db, stale_ids)
+    search_index.index_sections(db, project, sections)
     db.commit()
 
 
@@ -55,6 +82,8 @@ def create_project(
         slides=project_data.slides,
     )
     db.add(project)
+    db.flush()
+    search_index.index_project(db, project)
     db.commit()
     db.refresh(project)
 
@@ -70,10 +99,11 @@ def get_project(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth_utils.get_current_user),
 ):
-    project = (
+    project = archive.ensure_restored(
+        db,
         db.query(models.Project)
         .filter(models.Project.id == project_id, models.Project.user_id == current_user.id)
-        .first()
+        .first(),
     )
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -87,18 +117,27 @@ def update_project(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth_utils.get_current_user),
 ):
-    project = (
+    project = archive.ensure_restored(
+        db,
         db.query(models.Project)
         .filter(models.Project.id == project_id, models.Project.user_id == current_user.id)
-        .first()
+        .first(),
     )
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
     update_payload = project_data.dict(exclude_unset=True)
+    expected_version = update_payload.pop("version", None)
+    if expected_version is not None and expected_version != project.version:
+        raise _project_conflict(db, project_id)
     for key, value in update_payload.items():
         setattr(project, key, value)
-    db.commit()
+    search_index.index_project(db, project)
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise _project_conflict(db, project_id)
     db.refresh(project)
 
     titles = None
@@ -126,6 +165,7 @@ def delete_project(
     )
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
+    search_index.remove_project(db, project.id, [section.id for section in project.sections])
     db.delete(project)
     db.commit()
     return None
@@ -134,21 +174,22 @@ def delete_project(
 @router.get("/{project_id}/sections", response_model=List[schemas.SectionResponse])
 def list_project_sections(
     project_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth_utils.get_current_user),
 ):
-    project = (
+    project = archive.ensure_restored(
+        db,
         db.query(models.Project)
         .filter(models.Project.id == project_id, models.Project.user_id == current_user.id)
-        .first()
+        .first(),
     )
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    sections = (
-        db.query(models.Section)
-        .filter(models.Section.project_id == project.id)
+    rows = db.execute(
+        select(*response_columns(models.Section, schemas.SectionResponse))
+        .where(models.Section.project_id == project.id)
         .order_by(models.Section.order_index.asc())
-        .all()
-    )
-    return sections
+    ).mappings()
+    return compact_json_response(request, section_list_adapter, rows)
 
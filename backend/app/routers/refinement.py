@@ -1,15 +1,40 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from app import models, schemas, auth as auth_utils
-from app.database import get_db
-from app.services.ai_service import get_ai_service
+from app.database import SessionLocal, get_db
+from app.responses import compact_json_response, refinement_list_adapter, response_columns
+from app.services.ai_service import LLM_MAX_CONCURRENCY, get_ai_service
+from app.services import archive, search_index
 
 router = APIRouter()
 
+BULK_REFINEMENT_MAX_SECTIONS = int(os.getenv("BULK_REFINEMENT_MAX_SECTIONS", "100"))
+
+
+def _section_conflict(db: Session, section_id: int) -> HTTPException:
+    # Re-read rather than reuse the (possibly expired) ORM object: the section may have
+    # been deleted meanwhile, in which case ``current`` is null.
+    current = (
+        db.query(models.Section).filter(models.Section.id == section_id).populate_existing().first()
+    )
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={
+            "message": "Section was modified by another request.",
+            "current": schemas.SectionResponse.model_validate(current).model_dump(mode="json") if current else None,
+        },
+    )
+
 
 def _get_section(db: Session, section_id: int, user_id: int) -> models.Section:
-    section = (
+    query = (
         db.query(models.Section)
         .join(models.Project)
         .filter(
@@ -17,8 +42,10 @@ def _get_section(db: Session, section_id: int, user_id: int) -> models.Section:
             models.Project.user_id == user_id,
             models.Project.id == models.Section.project_id,
         )
-        .first()
     )
+    section = query.first()
+    if not section and archive.restore_archived_rows(db, user_id, section_ids=[section_id]):
+        section = query.first()
     if not section:
         raise HTTPException(status_code=404, detail="Section not found")
     return section
@@ -31,12 +58,15 @@ def refine_section(
     current_user: models.User = Depends(auth_utils.get_current_user),
 ):
     section = _get_section(db, request.section_id, current_user.id)
+    section_id = section.id
     project = section.project
     if not section.content:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Section has no content to refine yet.",
         )
+    if request.section_version is not None and request.section_version != section.version:
+        raise _section_conflict(db, section.id)
 
     ai_client = get_ai_service()
     refined_text = ai_client.refine_content(
@@ -45,6 +75,8 @@ def refine_section(
         section_title=section.title,
         current_content=section.content,
         prompt=request.prompt,
+        user_id=current_user.id,
+        project_id=project.id,
     )
 
     refinement = models.Refinement(
@@ -58,26 +90,197 @@ def refine_section(
 
     db.add(refinement)
     db.add(section)
-    db.commit()
+    search_index.index_sections(db, project, [section])
+    try:
+        # The UPDATE only matches if the section still has the version read above
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise _section_conflict(db, section_id)
     db.refresh(refinement)
     return refinement
 
 
+def _ndjson(payload: dict) -> str:
+    return json.dumps(payload) + "\n"
+
+
+def _stream_bulk_refinement(targets: List[dict], prompt: str, user_id: int):
+    """
+    Yield one NDJSON progress line per section as its LLM call finishes, then write every
+    successful refinement in a single transaction and yield the stored rows.
+    """
+    ai_client = get_ai_service()
+
+    def _refine(target: dict) -> str:
+        return ai_client.refine_content(
+            document_type=target["document_type"],
+            main_topic=target["main_topic"],
+            section_title=target["title"],
+            current_content=target["content"],
+            prompt=prompt,
+            user_id=user_id,
+            project_id=target["project_id"],
+        )
+
+    refined = {}
+    with ThreadPoolExecutor(max_workers=min(len(targets), LLM_MAX_CONCURRENCY)) as executor:
+        futures = {executor.submit(_refine, target): target for target in targets}
+        for future in as_completed(futures):
+            target = futures[future]
+            try:
+                refined[target["section_id"]] = future.result()
+            except Exception as exc:
+                detail = exc.detail if isinstance(exc, HTTPException) else str(exc)
+                yield _ndjson({"section_id": target["section_id"], "status": "failed", "detail": detail})
+                continue
+            yield _ndjson(
+                {
+                    "section_id": target["section_id"],
+                    "status": "refined",
+                    "completed": len(refined),
+                    "total": len(targets),
+                }
+            )
+
+    # The request-scoped session is not guaranteed to outlive the response, so the
+    # writes use their own session.
+    db = SessionLocal()
+    try:
+        refinements = []
+        conflicts = []
+        sections_by_project = {}
+        for target in targets:
+            if target["section_id"] not in refined:
+                continue
+            section = db.get(models.Section, target["section_id"])
+            if section is None or section.version != target["version"]:
+                # Changed since it was read: keep the newer content rather than overwrite it
+                conflicts.append(target["section_id"])
+                continue
+            refinements.append(
+                models.Refinement(
+                    project_id=section.project_id,
+                    section_id=section.id,
+                    prompt=prompt,
+                    original_content=target["content"],
+                    refined_content=refined[section.id],
+                )
+            )
+            section.content = refined[section.id]
+            sections_by_project.setdefault(section.project_id, []).append(section)
+        db.add_all(refinements)
+        for sections in sections_by_project.values():
+            search_index.index_sections(db, sections[0].project, sections)
+        db.commit()
+        yield _ndjson(
+            {
+                "status": "completed",
+                "conflicts": conflicts,
+                "refinements": [
+                    schemas.RefinementResponse.model_validate(refinement).model_dump(mode="json")
+                    for refinement in refinements
+                ],
+            }
+        )
+    except StaleDataError:
+        db.rollback()
+        yield _ndjson({"status": "conflict", "detail": "Sections were modified while saving; nothing was written."})
+    except Exception as exc:
+        db.rollback()
+        yield _ndjson({"status": "error", "detail": f"Saving refinements failed: {exc}"})
+    finally:
+        db.close()
+
+
+@router.post("/bulk")
+def refine_sections_bulk(
+    request: schemas.BulkRefinementRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth_utils.get_current_user),
+):
+    if request.project_id is None and not request.section_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide a project_id or a list of section_ids.",
+        )
+
+    if request.project_id is not None:
+        project = (
+            db.query(models.Project)
+            .filter(models.Project.id == request.project_id, models.Project.user_id == current_user.id)
+            .first()
+        )
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        archive.ensure_restored(db, project)
+    query = (
+        db.query(models.Section)
+        .join(models.Project)
+        .filter(models.Project.user_id == current_user.id)
+    )
+    if request.project_id is not None:
+        query = query.filter(models.Section.project_id == request.project_id)
+    if request.section_ids:
+        query = query.filter(models.Section.id.in_(request.section_ids))
+    query = query.order_by(models.Section.project_id, models.Section.order_index)
+    sections = query.all()
+
+    if request.section_ids and len(sections) != len(set(request.section_ids)):
+        missing = set(request.section_ids) - {section.id for section in sections}
+        if archive.restore_archived_rows(db, current_user.id, section_ids=missing):
+            sections = query.all()
+    if request.section_ids and len(sections) != len(set(request.section_ids)):
+        raise HTTPException(status_code=404, detail="Section not found")
+    sections = [section for section in sections if section.content]
+    if not sections:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No sections with content to refine.",
+        )
+    if len(sections) > BULK_REFINEMENT_MAX_SECTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {BULK_REFINEMENT_MAX_SECTIONS} sections can be refined at once.",
+        )
+
+    targets = [
+        {
+            "section_id": section.id,
+            "project_id": section.project_id,
+            "title": section.title,
+            "content": section.content,
+            "version": section.version,
+            "document_type": section.project.document_type,
+            "main_topic": section.project.main_topic,
+        }
+        for section in sections
+    ]
+    return StreamingResponse(
+        _stream_bulk_refinement(targets, request.prompt, current_user.id),
+        media_type="application/x-ndjson",
+    )
+
+
 @router.post("/feedback", response_model=schemas.RefinementResponse)
 def submit_feedback(
     feedback_payload: schemas.RefinementFeedback,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth_utils.get_current_user),
 ):
-    refinement = (
+    query = (
         db.query(models.Refinement)
         .join(models.Project)
         .filter(
             models.Refinement.id == feedback_payload.refinement_id,
             models.Project.user_id == current_user.id,
         )
-        .first()
     )
+    refinement = query.first()
+    if not refinement and archive.restore_archived_rows(
+        db, current_user.id, refinement_ids=[feedback_payload.refinement_id]
+    ):
+        refinement = query.first()
     if not refinement:
         raise HTTPException(status_code=404, detail="Refinement not found")
 
@@ -91,18 +294,24 @@ def submit_feedback(
 @router.get("/{project_id}", response_model=List[schemas.RefinementResponse])
 def list_refinements(
     project_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth_utils.get_current_user),
 ):
-    refinements = (
-        db.query(models.Refinement)
+    archive.ensure_restored(
+        db,
+        db.query(models.Project)
+        .filter(models.Project.id == project_id, models.Project.user_id == current_user.id)
+        .first(),
+    )
+    rows = db.execute(
+        select(*response_columns(models.Refinement, schemas.RefinementResponse))
         .join(models.Project)
-        .filter(
+        .where(
             models.Refinement.project_id == project_id,
             models.Project.user_id == current_user.id,
         )
         .order_by(models.Refinement.created_at.desc())
-        .all()
-    )
-    return refinements
+    ).mappings()
+    return compact_json_response(request, refinement_list_adapter, rows)
 
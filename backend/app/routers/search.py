@@ -0,0 +1,18 @@
+from typing import List
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app import models, schemas, auth as auth_utils
+from app.database import get_db
+from app.services import search_index
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[schemas.SearchResult])
+def search_content(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth_utils.get_current_user),
+):
+    return search_index.search(db, current_user.id, q, limit)
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app import models, schemas, auth as auth_utils
+from app.database import get_db
+from app.services.usage_tracker import get_usage_recorder, summarize_usage
+
+router = APIRouter()
+
+
+@router.get("/me", response_model=schemas.UsageSummary)
+def get_my_usage(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth_utils.get_current_user),
+):
+    get_usage_recorder().flush()
+    return summarize_usage(db, models.LLMUsage.user_id == current_user.id)
+
+
+@router.get("/projects/{project_id}", response_model=schemas.UsageSummary)
+def get_project_usage(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth_utils.get_current_user),
+):
+    project = (
+        db.query(models.Project)
+        .filter(models.Project.id == project_id, models.Project.user_id == current_user.id)
+        .first()
+    )
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    get_usage_recorder().flush()
+    return summarize_usage(db, models.LLMUsage.project_id == project.id)
@@ -44,6 +44,7 @@ class ProjectUpdate(BaseModel):
     main_topic: Optional[str] = None
     outline: Optional[List[str]] = None
     slides: Optional[List[str]] = None
+    version: Optional[int] = None  # When set, the update is rejected with 409 unless it matches
 
 class ProjectResponse(BaseModel):
     id: int
@@ -53,8 +54,10 @@ class ProjectResponse(BaseModel):
     main_topic: str
     outline: Optional[List[str]]
     slides: Optional[List[str]]
+    version: int
     created_at: datetime
     updated_at: Optional[datetime]
+    archived_at: Optional[datetime] = None  # Set while sections live in the archive; any read restores them
     
     class Config:
         from_attributes = True
@@ -72,6 +75,7 @@ class SectionResponse(BaseModel):
     title: str
     content: Optional[str]
     order_index: int
+    version: int
     created_at: datetime
     updated_at: Optional[datetime]
     
@@ -82,6 +86,12 @@ class SectionResponse(BaseModel):
 class RefinementRequest(BaseModel):
     section_id: int
     prompt: str
+    section_version: Optional[int] = None  # When set, the refinement is rejected with 409 unless it matches
+
+class BulkRefinementRequest(BaseModel):
+    prompt: str
+    project_id: Optional[int] = None  # Refine every section of the project...
+    section_ids: Optional[List[int]] = None  # ...or only these sections
 
 class RefinementFeedback(BaseModel):
     refinement_id: int
@@ -105,6 +115,7 @@ class RefinementResponse(BaseModel):
 # Document generation schemas
 class GenerateContentRequest(BaseModel):
     project_id: int
+    mode: str = "missing"  # "missing" fills empty sections, "stale" also regenerates sections whose inputs changed
 
 class AITemplateRequest(BaseModel):
     document_type: str
@@ -114,3 +125,110 @@ class AITemplateResponse(BaseModel):
     outline: Optional[List[str]] = None
     slides: Optional[List[str]] = None
 
+
+# Usage accounting schemas
+class UsageBreakdown(BaseModel):
+    model: str
+    operation: str
+    calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    avg_latency_ms: float
+    estimated_cost_usd: float
+
+class UsageSummary(BaseModel):
+    calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    estimated_cost_usd: float
+    breakdown: List[UsageBreakdown]
+
+# Profiler schemas
+class ProfilerStartRequest(BaseModel):
+    routes: List[str] = []  # Route path prefixes, e.g. "/api/documents/{project_id}/export"; empty means all
+    duration_seconds: float = 30
+    max_requests: Optional[int] = None
+    interval_ms: float = 10
+    slow_request_ms: Optional[float] = None  # Keep a sampled pstats dump for requests slower than this
+
+class ProfilerSlowRequest(BaseModel):
+    index: int
+    route: str
+    elapsed_ms: float
+
+class ProfilerStatus(BaseModel):
+    active: bool
+    routes: List[str]
+    started_at: float
+    stopped_at: Optional[float]
+    duration_seconds: float
+    max_requests: Optional[int]
+    requests_profiled: int
+    samples: int
+    slow_requests: List[ProfilerSlowRequest]
+
+# Search schemas
+class SearchResult(BaseModel):
+    kind: str  # "project" or "section"
+    project_id: int
+    section_id: Optional[int]
+    title: str
+    snippet: str
+    score: float
+
+# Outline precompute schemas
+class PrecomputeRunRequest(BaseModel):
+    top_k: Optional[int] = None  # Defaults to PRECOMPUTE_TOP_K
+    token_budget: Optional[int] = None  # Defaults to PRECOMPUTE_TOKEN_BUDGET
+
+class PrecomputeRunResult(BaseModel):
+    refreshed: int
+    skipped_fresh: int
+    failed: int
+    tokens_spent: int
+    token_budget: int
+
+class PrecomputeRunStatus(BaseModel):
+    status: str  # "running", "completed" or "failed"
+    started_at: float
+    finished_at: Optional[float] = None
+    top_k: int
+    token_budget: int
+    result: Optional[PrecomputeRunResult] = None
+    error: Optional[str] = None
+
+class OutlineTopic(BaseModel):
+    document_type: str
+    main_topic: str
+    request_count: int
+    last_requested_at: Optional[datetime]
+    refreshed_at: Optional[datetime]
+    precomputed: bool
+
+# Archive schemas
+class ArchiveRunRequest(BaseModel):
+    inactive_days: Optional[int] = None  # Defaults to ARCHIVE_INACTIVE_DAYS
+    limit: Optional[int] = None  # Defaults to ARCHIVE_BATCH_SIZE
+
+class ArchiveStats(BaseModel):
+    archived: int
+    raw_bytes: int
+    stored_bytes: int
+
+# Admission control schemas
+class AdmissionClassStats(BaseModel):
+    route_class: str
+    concurrency: int
+    queue_size: int
+    in_flight: int
+    queued: int
+    admitted: int
+    rejected_queue_full: int
+    rejected_timeout: int
+    avg_queue_ms: float
+    p50_queue_ms: float
+    p95_queue_ms: float
+    max_queue_ms: float
+    avg_service_ms: float
@@ -0,0 +1,48 @@
+"""
+Multi-worker launcher.
+
+    python -m app.server --workers 4 --port 8000
+
+Each uvicorn worker is a separate process, so anything kept in process memory (caches,
+counters, limits) would fragment across them. When more than one worker is requested and
+``SHARED_STATE_URL`` is still the in-memory default, the launcher points every worker at
+one SQLite shared-state file instead.
+
+Schema setup also runs once, here in the parent, before any worker starts: workers
+racing through ``create_all`` and the search-index backfill on a fresh database fail.
+"""
+import argparse
+import os
+import uvicorn
+
+DEFAULT_SHARED_STATE_PATH = "./shared_state.db"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the API with one or more uvicorn workers.")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")))
+    options = parser.parse_args()
+
+    shared_state_url = os.getenv("SHARED_STATE_URL", "memory://")
+    if options.workers > 1 and shared_state_url.startswith("memory://"):
+        os.environ["SHARED_STATE_URL"] = f"sqlite:///{DEFAULT_SHARED_STATE_PATH}"
+        print(f"Using {os.environ['SHARED_STATE_URL']} as shared state for {options.workers} workers")
+
+    if os.getenv("INIT_DB_ON_STARTUP", "true").lower() == "true":
+        from app.database import init_db
+
+        init_db()
+        os.environ["INIT_DB_ON_STARTUP"] = "false"
+
+    uvicorn.run(
+        "app.main:app",
+        host=options.host,
+        port=options.port,
+        workers=options.workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,22 @@
+import hashlib
+import json
 import os
-from typing import List
-from openai import OpenAI
+import threading
+import time
+from typing import List, Optional
 from fastapi import HTTPException, status
 from functools import lru_cache
+from app.services.usage_tracker import UsageRecord, get_usage_recorder
+
+# Bump when the section generation prompt changes so existing content is reported as stale
+SECTION_PROMPT_VERSION = "section-v1"
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+
+# Cap on in-flight OpenAI requests within one worker process, shared by every endpoint
+# that fans out. It is not coordinated across workers: with ``--workers N`` up to
+# N * LLM_MAX_CONCURRENCY calls can be in flight.
+worker_llm_limiter = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
 
 
 class AIService:
@@ -16,6 +30,9 @@ class AIService:
         if not api_key:
             raise RuntimeError("OPENAI_API_KEY is not set.")
         self.model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        # Imported here so that importing the routers does not pay for the OpenAI SDK
+        from openai import OpenAI
+
         self.client = OpenAI(api_key=api_key)
 
     def _extract_text(self, response) -> str:
@@ -30,7 +47,46 @@ class AIService:
                 detail=f"Unable to parse response from OpenAI: {exc}",
             ) from exc
 
-    def suggest_outline(self, document_type: str, main_topic: str) -> List[str]:
+    def _chat(
+        self,
+        operation: str,
+        messages: List[dict],
+        temperature: float,
+        user_id: Optional[int] = None,
+        project_id: Optional[int] = None,
+    ):
+        with worker_llm_limiter:
+            started = time.perf_counter()
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+            )
+        latency_ms = int((time.perf_counter() - started) * 1000)
+
+        usage = getattr(response, "usage", None)
+        get_usage_recorder().record(
+            UsageRecord(
+                operation=operation,
+                model=getattr(response, "model", None) or self.model,
+                prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+                completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+                total_tokens=getattr(usage, "total_tokens", 0) or 0,
+                latency_ms=latency_ms,
+                user_id=user_id,
+                project_id=project_id,
+            )
+        )
+        return response
+
+    def suggest_outline(
+        self,
+        document_type: str,
+        main_topic: str,
+        user_id: Optional[int] = None,
+        project_id: Optional[int] = None,
+        operation: str = "suggest_outline",
+    ) -> List[str]:
         if document_type not in {"docx", "pptx"}:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -42,8 +98,8 @@ class AIService:
             f"You are assisting with creating a structured business document about: {main_topic}.\n"
             f"Propose 6-8 concise {doc_label} in order. Each line should be a single heading without numbering."
         )
-        response = self.client.chat.completions.create(
-            model=self.model,
+        response = self._chat(
+            operation,
             messages=[
                 {
                     "role": "system",
@@ -52,17 +108,29 @@ class AIService:
                 {"role": "user", "content": prompt},
             ],
             temperature=0.4,
+            user_id=user_id,
+            project_id=project_id,
         )
         text = self._extract_text(response)
         lines = [line.strip("-• ").strip() for line in text.split("\n") if line.strip()]
         return [line for line in lines if line]
 
+    def section_fingerprint(self, document_type: str, main_topic: str, section_title: str) -> str:
+        """Hash of every input that affects ``generate_section_content`` output."""
+        payload = json.dumps(
+            [document_type, main_topic, section_title, self.model, SECTION_PROMPT_VERSION],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
     def generate_section_content(
         self,
         document_type: str,
         main_topic: str,
         section_title: str,
         guidance: str | None = None,
+        user_id: Optional[int] = None,
+        project_id: Optional[int] = None,
     ) -> str:
         doc_context = (
             "a detailed narrative section suitable for a Word document"
@@ -76,8 +144,8 @@ class AIService:
             f"Create {doc_context} that flows professionally and keeps business readers in mind."
             f"{refinement}"
         )
-        response = self.client.chat.completions.create(
-            model=self.model,
+        response = self._chat(
+            "generate_section_content",
             messages=[
                 {
                     "role": "system",
@@ -91,6 +159,8 @@ class AIService:
                 {"role": "user", "content": prompt},
             ],
             temperature=0.6,
+            user_id=user_id,
+            project_id=project_id,
         )
         return self._extract_text(response).strip()
 
@@ -101,6 +171,8 @@ class AIService:
         section_title: str,
         current_content: str,
         prompt: str,
+        user_id: Optional[int] = None,
+        project_id: Optional[int] = None,
     ) -> str:
         doc_context = (
             "Word document section" if document_type == "docx" else "PowerPoint slide"
@@ -118,13 +190,15 @@ class AIService:
             f"User refinement request: {prompt}\n"
             "Return only the updated content in plain text without markdown."
         )
-        response = self.client.chat.completions.create(
-            model=self.model,
+        response = self._chat(
+            "refine_content",
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
             temperature=0.5,
+            user_id=user_id,
+            project_id=project_id,
         )
         return self._extract_text(response).strip()
 
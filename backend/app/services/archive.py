@@ -0,0 +1,353 @@
+import argparse
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import DateTime, delete, func, or_, select, text, update
+from sqlalchemy.orm import Session
+from app import models
+from app.database import SessionLocal
+from app.services import search_index
+from app.services.shared_state import get_shared_state
+
+ARCHIVE_ENABLED = os.getenv("ARCHIVE_ENABLED", "false").lower() == "true"
+ARCHIVE_INACTIVE_DAYS = int(os.getenv("ARCHIVE_INACTIVE_DAYS", "90"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "200"))
+ARCHIVE_INTERVAL_HOURS = float(os.getenv("ARCHIVE_INTERVAL_HOURS", "24"))
+ARCHIVE_CODEC = os.getenv("ARCHIVE_CODEC", "auto")  # "auto" (zstd when installed), "zstd" or "zlib"
+ARCHIVE_ZLIB_LEVEL = int(os.getenv("ARCHIVE_ZLIB_LEVEL", "9"))
+ARCHIVE_ZSTD_LEVEL = int(os.getenv("ARCHIVE_ZSTD_LEVEL", "19"))
+
+# Archived rows, oldest table first on restore so foreign keys resolve
+_ARCHIVED_MODELS = (models.Section, models.Refinement)
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def resolve_codec(codec: str = ARCHIVE_CODEC) -> str:
+    if codec == "auto":
+        return "zstd" if _zstd() is not None else "zlib"
+    if codec == "zstd" and _zstd() is None:
+        raise RuntimeError("ARCHIVE_CODEC=zstd requires the optional 'zstandard' package.")
+    if codec not in {"zstd", "zlib"}:
+        raise ValueError(f"Unknown archive codec: {codec}")
+    return codec
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return _zstd().ZstdCompressor(level=ARCHIVE_ZSTD_LEVEL).compress(data)
+    return zlib.compress(data, ARCHIVE_ZLIB_LEVEL)
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    # Archives are read with the codec they were written with, whatever ARCHIVE_CODEC is now
+    if codec == "zstd":
+        zstandard = _zstd()
+        if zstandard is None:
+            raise RuntimeError("This project was archived with zstd; install 'zstandard' to restore it.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def _dump_rows(model, rows: Iterable) -> List[dict]:
+    columns = model.__table__.columns
+    dumped = []
+    for row in rows:
+        item = {}
+        for column in columns:
+            value = row[column.name]
+            item[column.name] = value.isoformat() if isinstance(value, datetime) else value
+        dumped.append(item)
+    return dumped
+
+
+def _load_rows(model, rows: List[dict]) -> List[dict]:
+    datetime_columns = [column.name for column in model.__table__.columns if isinstance(column.type, DateTime)]
+    for row in rows:
+        for name in datetime_columns:
+            if row.get(name):
+                row[name] = datetime.fromisoformat(row[name])
+    return rows
+
+
+def _insert_rows(db: Session, model, rows: List[dict]) -> dict:
+    """
+    Insert archived rows with their original ids. A row whose id has been taken since
+    (possible in SQLite databases created before ids were reserved) gets a new one.
+    Returns {old id: new id} for the renumbered rows.
+    """
+    taken = set(db.scalars(select(model.id).where(model.id.in_([row["id"] for row in rows]))))
+    kept = [row for row in rows if row["id"] not in taken]
+    if kept:
+        db.execute(model.__table__.insert(), kept)
+    renumbered = {}
+    for row in rows:
+        if row["id"] in taken:
+            old_id = row.pop("id")
+            renumbered[old_id] = db.execute(model.__table__.insert().values(**row)).inserted_primary_key[0]
+    return renumbered
+
+
+def reserve_archived_ids(engine, tables: Iterable[str]) -> None:
+    """
+    Raise the SQLite AUTOINCREMENT counters of ``tables`` above every id held in an
+    archive, so rows created later never take an id an archived row will come back with.
+    """
+    columns = {
+        models.Section.__tablename__: models.ProjectArchive.section_ids,
+        models.Refinement.__tablename__: models.ProjectArchive.refinement_ids,
+    }
+    with engine.begin() as conn:
+        for table in tables:
+            if table not in columns:
+                continue
+            highest = max((max(ids) for (ids,) in conn.execute(select(columns[table])) if ids), default=0)
+            if not highest:
+                continue
+            conn.execute(text("UPDATE sqlite_sequence SET seq = :seq WHERE name = :name AND seq < :seq"), {"name": table, "seq": highest})
+            conn.execute(
+                text(
+                    "INSERT INTO sqlite_sequence (name, seq) "
+                    "SELECT :name, :seq WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = :name)"
+                ),
+                {"name": table, "seq": highest},
+            )
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def archive_payload(db: Session, project_id: int) -> dict:
+    """Every archived row of the project, keyed by table name, as JSON-ready dicts."""
+    return {
+        model.__tablename__: _dump_rows(
+            model, db.execute(select(model.__table__).where(model.project_id == project_id)).mappings()
+        )
+        for model in _ARCHIVED_MODELS
+    }
+
+
+def archive_project(db: Session, project: models.Project, codec: Optional[str] = None) -> models.ProjectArchive:
+    """
+    Move a project's sections and refinements into one compressed ``project_archives``
+    row. The project row itself stays, so listings, ownership checks and ids are
+    unchanged; ``archived_at`` marks that its content must be restored before use.
+    """
+    codec = resolve_codec(codec or ARCHIVE_CODEC)
+    payload = archive_payload(db, project.id)
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    stored = compress(raw, codec)
+    archive = models.ProjectArchive(
+        project_id=project.id,
+        codec=codec,
+        payload=stored,
+        section_ids=[row["id"] for row in payload[models.Section.__tablename__]],
+        refinement_ids=[row["id"] for row in payload[models.Refinement.__tablename__]],
+        raw_bytes=len(raw),
+        stored_bytes=len(stored),
+    )
+    db.add(archive)
+    for model in reversed(_ARCHIVED_MODELS):
+        db.execute(delete(model).where(model.project_id == project.id))
+    search_index.remove_sections(db, archive.section_ids)
+    # A bulk UPDATE leaves the version column alone: archiving is invisible to clients
+    # holding the project's version for an optimistic write. Setting updated_at to itself
+    # keeps its onupdate from firing, so archiving does not count as activity either.
+    db.execute(
+        update(models.Project)
+        .where(models.Project.id == project.id)
+        .values(archived_at=func.now(), updated_at=models.Project.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    db.expire(project)
+    return archive
+
+
+def restore_project(db: Session, project_id: int) -> bool:
+    """Move an archived project's rows back into the hot tables. Returns False if it was not archived."""
+    archive = db.get(models.ProjectArchive, project_id)
+    if archive is None:
+        return False
+    payload = json.loads(decompress(archive.payload, archive.codec))
+    # Claim the archive first: a concurrent restore of the same project blocks here and
+    # then finds nothing to delete, instead of inserting the rows a second time.
+    claimed = db.execute(
+        delete(models.ProjectArchive).where(models.ProjectArchive.project_id == project_id)
+    ).rowcount
+    if not claimed:
+        db.rollback()
+        return False
+    renumbered_sections = {}
+    for model in _ARCHIVED_MODELS:
+        rows = _load_rows(model, payload.get(model.__tablename__, []))
+        if model is models.Refinement:
+            for row in rows:
+                row["section_id"] = renumbered_sections.get(row["section_id"], row["section_id"])
+        if rows:
+            renumbered = _insert_rows(db, model, rows)
+            if model is models.Section:
+                renumbered_sections = renumbered
+    db.execute(
+        update(models.Project)
+        .where(models.Project.id == project_id)
+        .values(archived_at=None, updated_at=models.Project.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    project = db.get(models.Project, project_id)
+    db.expire(project)
+    search_index.index_sections(
+        db, project, db.query(models.Section).filter(models.Section.project_id == project_id).all()
+    )
+    db.commit()
+    return True
+
+
+def ensure_restored(db: Session, project: Optional[models.Project]) -> Optional[models.Project]:
+    """Restore ``project`` if it is archived. Cheap for hot projects: only ``archived_at`` is checked."""
+    if project is not None and project.archived_at is not None:
+        restore_project(db, project.id)
+        db.refresh(project)
+    return project
+
+
+def restore_archived_rows(
+    db: Session,
+    user_id: int,
+    section_ids: Iterable[int] = (),
+    refinement_ids: Iterable[int] = (),
+) -> bool:
+    """
+    Restore the user's archived projects that contain any of the given section or
+    refinement ids. Called after a lookup by id missed, so hot requests never pay for it.
+    """
+    section_ids, refinement_ids = set(section_ids), set(refinement_ids)
+    archives = (
+        db.query(models.ProjectArchive.project_id, models.ProjectArchive.section_ids, models.ProjectArchive.refinement_ids)
+        .join(models.Project, models.Project.id == models.ProjectArchive.project_id)
+        .filter(models.Project.user_id == user_id)
+        .all()
+    )
+    restored = False
+    for project_id, archived_sections, archived_refinements in archives:
+        if section_ids.intersection(archived_sections) or refinement_ids.intersection(archived_refinements):
+            restored = restore_project(db, project_id) or restored
+    return restored
+
+
+def inactive_projects(db: Session, inactive_days: int, limit: int) -> List[models.Project]:
+    """Hot projects with no project, section or refinement write in the last ``inactive_days``."""
+    cutoff = _utcnow() - timedelta(days=inactive_days)
+    last_section = (
+        select(
+            models.Section.project_id,
+            func.max(func.coalesce(models.Section.updated_at, models.Section.created_at)).label("touched_at"),
+        )
+        .group_by(models.Section.project_id)
+        .subquery()
+    )
+    last_refinement = (
+        select(models.Refinement.project_id, func.max(models.Refinement.created_at).label("touched_at"))
+        .group_by(models.Refinement.project_id)
+        .subquery()
+    )
+    return (
+        db.query(models.Project)
+        .outerjoin(last_section, last_section.c.project_id == models.Project.id)
+        .outerjoin(last_refinement, last_refinement.c.project_id == models.Project.id)
+        .filter(
+            models.Project.archived_at.is_(None),
+            func.coalesce(models.Project.updated_at, models.Project.created_at) < cutoff,
+            or_(last_section.c.touched_at.is_(None), last_section.c.touched_at < cutoff),
+            or_(last_refinement.c.touched_at.is_(None), last_refinement.c.touched_at < cutoff),
+        )
+        .order_by(models.Project.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def archive_inactive_projects(
+    db: Session,
+    inactive_days: int = ARCHIVE_INACTIVE_DAYS,
+    limit: int = ARCHIVE_BATCH_SIZE,
+    codec: Optional[str] = None,
+) -> dict:
+    archived = raw_bytes = stored_bytes = 0
+    for project in inactive_projects(db, inactive_days, limit):
+        archive = archive_project(db, project, codec)
+        archived += 1
+        raw_bytes += archive.raw_bytes
+        stored_bytes += archive.stored_bytes
+    return {"archived": archived, "raw_bytes": raw_bytes, "stored_bytes": stored_bytes}
+
+
+def archive_stats(db: Session) -> dict:
+    count, raw_bytes, stored_bytes = db.query(
+        func.count(models.ProjectArchive.project_id),
+        func.coalesce(func.sum(models.ProjectArchive.raw_bytes), 0),
+        func.coalesce(func.sum(models.ProjectArchive.stored_bytes), 0),
+    ).one()
+    return {"archived": count, "raw_bytes": raw_bytes, "stored_bytes": stored_bytes}
+
+
+def _interval_slot(interval_hours: float) -> Tuple[int, int]:
+    seconds = max(int(interval_hours * 3600), 1)
+    return int(time.time()) // seconds, seconds
+
+
+class ArchiveScheduler:
+    """
+    Archives a batch of inactive projects every ARCHIVE_INTERVAL_HOURS. The shared-state
+    counter lets one worker process per interval do the work.
+    """
+
+    def __init__(self, interval_hours: float = ARCHIVE_INTERVAL_HOURS) -> None:
+        self.interval_hours = interval_hours
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="project-archiver", daemon=True)
+
+    def start(self) -> None:
+        self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            slot, seconds = _interval_slot(self.interval_hours)
+            if get_shared_state().incr(f"archive:claimed:{slot}", ttl=2 * seconds) == 1:
+                db = SessionLocal()
+                try:
+                    print(f"Archived inactive projects: {archive_inactive_projects(db)}")
+                except Exception as exc:  # pragma: no cover
+                    db.rollback()
+                    print(f"Archiving failed: {exc}")
+                finally:
+                    db.close()
+            if self._stopped.wait(min(seconds, 3600)):
+                return
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive projects with no activity in the last N days.")
+    parser.add_argument("--inactive-days", type=int, default=ARCHIVE_INACTIVE_DAYS)
+    parser.add_argument("--limit", type=int, default=ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--codec", default=None, help="zstd, zlib or auto (default: ARCHIVE_CODEC)")
+    options = parser.parse_args()
+    session = SessionLocal()
+    try:
+        print(archive_inactive_projects(session, options.inactive_days, options.limit, options.codec))
+    finally:
+        session.close()
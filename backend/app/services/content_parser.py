@@ -0,0 +1,59 @@
+import re
+from typing import List, NamedTuple
+
+
+class Block(NamedTuple):
+    kind: str  # "paragraph", "bullet" or "number"
+    text: str
+    level: int = 0  # Nesting depth for list items
+    number: int | None = None  # Source number of a numbered item
+
+
+# "- item", "• item", "* item", "– item" / "1. item", "2) item"
+_BULLET_RE = re.compile(r"^(\s*)[-•*–]\s+(.*)$")
+_NUMBER_RE = re.compile(r"^(\s*)(\d+)[.)]\s+(.*)$")
+_INDENT_WIDTH = 2
+MAX_LEVEL = 4
+
+
+def _level(indent: str) -> int:
+    return min(len(indent.replace("\t", " " * _INDENT_WIDTH)) // _INDENT_WIDTH, MAX_LEVEL)
+
+
+def parse_content(content: str | None) -> List[Block]:
+    """
+    Single pass over the plain text that ``AIService`` produces. Blank lines end a
+    paragraph, consecutive text lines are joined into one paragraph, and dash or numbered
+    lines become list items whose indentation sets their level.
+    """
+    blocks: List[Block] = []
+    paragraph: List[str] = []
+
+    def _flush() -> None:
+        if paragraph:
+            blocks.append(Block("paragraph", "\n".join(paragraph)))
+            paragraph.clear()
+
+    for raw_line in (content or "").splitlines():
+        line = raw_line.rstrip()
+        if not line.strip():
+            _flush()
+            continue
+        match = _NUMBER_RE.match(line)
+        if match:
+            _flush()
+            blocks.append(Block("number", match.group(3).strip(), _level(match.group(1)), int(match.group(2))))
+            continue
+        match = _BULLET_RE.match(line)
+        if match:
+            _flush()
+            blocks.append(Block("bullet", match.group(2).strip(), _level(match.group(1))))
+            continue
+        if blocks and not paragraph and blocks[-1].kind != "paragraph" and raw_line[:1].isspace():
+            # Indented continuation of the previous list item
+            previous = blocks[-1]
+            blocks[-1] = previous._replace(text=f"{previous.text} {line.strip()}")
+            continue
+        paragraph.append(line.strip())
+    _flush()
+    return blocks
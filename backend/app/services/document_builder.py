@@ -1,9 +1,79 @@
 import io
-from typing import Iterable
+import math
+import os
+from typing import Iterable, List
 from fastapi import HTTPException, status
-from fastapi.responses import StreamingResponse
-from docx import Document
-from pptx import Presentation
+from fastapi.responses import Response
+from app.services.content_parser import Block, parse_content
+
+# Rough capacity of the default 16:9 body placeholder at its default font size
+PPTX_MAX_LINES_PER_SLIDE = int(os.getenv("PPTX_MAX_LINES_PER_SLIDE", "10"))
+PPTX_CHARS_PER_LINE = int(os.getenv("PPTX_CHARS_PER_LINE", "70"))
+
+_DOCX_MAX_LIST_LEVEL = 2  # The default template ships "List Bullet" .. "List Bullet 3"
+
+
+class _DocxStyles:
+    """
+    Resolves each style once per document. Looking a style up by name, or assigning a
+    style object through ``paragraph.style``, scans the whole styles part; on a long
+    document that dominated render time. Paragraphs get the cached style id instead.
+    """
+
+    def __init__(self, doc) -> None:
+        self._doc = doc
+        self._cache = {}
+
+    def get(self, name: str):
+        if name not in self._cache:
+            self._cache[name] = self._doc.styles[name]
+        return self._cache[name]
+
+    def for_block(self, block: Block):
+        if block.kind == "paragraph":
+            return None
+        base = "List Bullet" if block.kind == "bullet" else "List Number"
+        level = min(block.level, _DOCX_MAX_LIST_LEVEL)
+        return self.get(base if level == 0 else f"{base} {level + 1}")
+
+    def add_paragraph(self, text: str, style=None):
+        paragraph = self._doc.add_paragraph(text)
+        if style is not None:
+            paragraph._p.style = style.style_id
+        return paragraph
+
+
+def _start_numbered_list(doc, style, start: int = 1) -> int:
+    """
+    Every "List Number" paragraph shares one numbering sequence, so a second list would
+    continue from the first. Give each new list its own w:num starting at ``start``: an
+    item separated from the previous one by a paragraph ("1. X", explanation, "2. Y")
+    opens a new sequence that must still show its source number.
+    """
+    numbering = doc.part.numbering_part.element
+    abstract_id = numbering.num_having_numId(style.element.pPr.numPr.numId.val).abstractNumId.val
+    num = numbering.add_num(abstract_id)
+    num.add_lvlOverride(ilvl=0).add_startOverride(start)
+    return num.numId
+
+
+def _render_docx_blocks(doc, styles: _DocxStyles, blocks: List[Block]) -> None:
+    list_num_ids = {}  # level -> numId of the numbered list currently open at that level
+    for block in blocks:
+        style = styles.for_block(block)
+        paragraph = styles.add_paragraph(block.text, style)
+        if block.kind != "number":
+            if block.level == 0:
+                list_num_ids.clear()
+            continue
+        level = min(block.level, _DOCX_MAX_LIST_LEVEL)
+        if level not in list_num_ids or block.number == 1:
+            list_num_ids[level] = _start_numbered_list(doc, style, block.number or 1)
+        for deeper in [key for key in list_num_ids if key > level]:
+            del list_num_ids[deeper]
+        num_pr = paragraph._p.get_or_add_pPr().get_or_add_numPr()
+        num_pr.get_or_add_ilvl().val = 0
+        num_pr.get_or_add_numId().val = list_num_ids[level]
 
 
 def export_docx(project, sections: Iterable):
@@ -13,24 +83,65 @@ def export_docx(project, sections: Iterable):
             detail="Project is not configured as a Word document.",
         )
 
+    from docx import Document
+
     doc = Document()
-    doc.add_heading(project.title, 0)
+    styles = _DocxStyles(doc)
+    styles.add_paragraph(project.title, styles.get("Title"))
+    heading_style = styles.get("Heading 1")
     for section in sorted(sections, key=lambda s: s.order_index):
-        doc.add_heading(section.title, level=1)
-        content = section.content or ""
-        for paragraph in content.split("\n\n"):
-            doc.add_paragraph(paragraph.strip())
+        styles.add_paragraph(section.title, heading_style)
+        _render_docx_blocks(doc, styles, parse_content(section.content))
 
     buffer = io.BytesIO()
     doc.save(buffer)
-    buffer.seek(0)
-    return StreamingResponse(
-        buffer,
+    # A plain Response sends the file in one piece; StreamingResponse over a BytesIO
+    # iterates it "line" by line, which for zip data means thousands of tiny chunks.
+    return Response(
+        buffer.getvalue(),
         media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
         headers={"Content-Disposition": f'attachment; filename="{project.title}.docx"'},
     )
 
 
+def _block_lines(block: Block) -> int:
+    width = max(PPTX_CHARS_PER_LINE - 6 * block.level, 20)
+    return sum(max(1, math.ceil(len(line) / width)) for line in block.text.split("\n"))
+
+
+def paginate_blocks(blocks: List[Block]) -> List[List[Block]]:
+    """Split a slide's blocks into pages that fit the body placeholder; never splits a block."""
+    pages: List[List[Block]] = [[]]
+    used = 0
+    for block in blocks:
+        lines = _block_lines(block)
+        if pages[-1] and used + lines > PPTX_MAX_LINES_PER_SLIDE:
+            pages.append([])
+            used = 0
+        pages[-1].append(block)
+        used += lines
+    return pages
+
+
+def _render_pptx_blocks(text_frame, blocks: List[Block]) -> None:
+    from pptx.oxml.xmlchemy import OxmlElement
+
+    for idx, block in enumerate(blocks):
+        paragraph = text_frame.paragraphs[0] if idx == 0 else text_frame.add_paragraph()
+        if block.kind == "number":
+            paragraph.text = f"{block.number}. {block.text}"
+        else:
+            paragraph.text = block.text
+        paragraph.level = min(block.level, 8)
+        if block.kind != "bullet":
+            # The body placeholder bullets every paragraph by default
+            p_pr = paragraph._p.get_or_add_pPr()
+            p_pr.set("indent", "0")
+            if block.level == 0:
+                p_pr.set("marL", "0")
+            p_pr.append(OxmlElement("a:buNone"))
+
+
 def export_pptx(project, sections: Iterable):
     if project.document_type != "pptx":
         raise HTTPException(
@@ -38,20 +149,23 @@ def export_pptx(project, sections: Iterable):
             detail="Project is not configured as a PowerPoint document.",
         )
 
+    from pptx import Presentation
+
     presentation = Presentation()
+    slide_layout = presentation.slide_layouts[1]
     for section in sorted(sections, key=lambda s: s.order_index):
-        slide_layout = presentation.slide_layouts[1]
-        slide = presentation.slides.add_slide(slide_layout)
-        slide.shapes.title.text = section.title
-        body_shape = slide.shapes.placeholders[1]
-        body_shape.text = section.content or ""
+        pages = paginate_blocks(parse_content(section.content))
+        for page_number, blocks in enumerate(pages):
+            slide = presentation.slides.add_slide(slide_layout)
+            slide.shapes.title.text = section.title if page_number == 0 else f"{section.title} (cont.)"
+            text_frame = slide.shapes.placeholders[1].text_frame
+            text_frame.word_wrap = True
+            _render_pptx_blocks(text_frame, blocks)
 
     buffer = io.BytesIO()
     presentation.save(buffer)
-    buffer.seek(0)
-    return StreamingResponse(
-        buffer,
+    return Response(
+        buffer.getvalue(),
         media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
         headers={"Content-Disposition": f'attachment; filename="{project.title}.pptx"'},
     )
-
@@ -0,0 +1,327 @@
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app import models
+from app.database import SessionLocal
+from app.services.shared_state import get_shared_state
+from app.services.usage_tracker import get_usage_recorder
+
+PRECOMPUTE_ENABLED = os.getenv("PRECOMPUTE_ENABLED", "false").lower() == "true"
+PRECOMPUTE_WINDOW_UTC = os.getenv("PRECOMPUTE_WINDOW_UTC", "02:00-05:00")
+PRECOMPUTE_TOP_K = int(os.getenv("PRECOMPUTE_TOP_K", "100"))
+PRECOMPUTE_TOKEN_BUDGET = int(os.getenv("PRECOMPUTE_TOKEN_BUDGET", "100000"))
+PRECOMPUTE_REFRESH_AFTER_HOURS = float(os.getenv("PRECOMPUTE_REFRESH_AFTER_HOURS", "168"))
+PRECOMPUTE_LOOKBACK_DAYS = int(os.getenv("PRECOMPUTE_LOOKBACK_DAYS", "30"))
+PRECOMPUTE_CHECK_INTERVAL_SECONDS = float(os.getenv("PRECOMPUTE_CHECK_INTERVAL_SECONDS", "300"))
+PRECOMPUTE_RUN_TIMEOUT_SECONDS = float(os.getenv("PRECOMPUTE_RUN_TIMEOUT_SECONDS", "3600"))
+POPULARITY_FLUSH_INTERVAL_SECONDS = float(os.getenv("POPULARITY_FLUSH_INTERVAL_SECONDS", "10"))
+
+PRECOMPUTE_OPERATION = "precompute_outline"
+
+
+def topic_key(main_topic: str) -> str:
+    return " ".join(main_topic.lower().split())
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class PopularityRecorder:
+    """
+    Counts /template requests per (document_type, topic) in memory and folds them into
+    ``outline_suggestions`` from a background thread, keeping the request path free of
+    database writes.
+    """
+
+    def __init__(self, flush_interval: float = POPULARITY_FLUSH_INTERVAL_SECONDS) -> None:
+        self.flush_interval = flush_interval
+        self._counts: Counter = Counter()
+        self._spellings = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="popularity-recorder", daemon=True)
+        self._worker.start()
+
+    def record(self, document_type: str, main_topic: str) -> None:
+        key = (document_type, topic_key(main_topic))
+        with self._lock:
+            self._counts[key] += 1
+            self._spellings[key] = main_topic
+
+    def flush(self) -> None:
+        with self._lock:
+            counts, spellings = self._counts, self._spellings
+            self._counts, self._spellings = Counter(), {}
+        if not counts:
+            return
+        db = SessionLocal()
+        try:
+            for _ in range(2):
+                try:
+                    self._write(db, counts, spellings)
+                    return
+                except IntegrityError:
+                    # store_outline inserted one of these topics first; the retry updates that row
+                    db.rollback()
+            print(f"Popularity flush kept conflicting, dropping {len(counts)} topics")
+        except Exception as exc:  # pragma: no cover
+            db.rollback()
+            print(f"Popularity flush failed, dropping {len(counts)} topics: {exc}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def _write(db: Session, counts: Counter, spellings: dict) -> None:
+        now = _utcnow()
+        for (document_type, key), count in counts.items():
+            row = (
+                db.query(models.OutlineSuggestion)
+                .filter(
+                    models.OutlineSuggestion.document_type == document_type,
+                    models.OutlineSuggestion.topic_key == key,
+                )
+                .first()
+            )
+            if row is None:
+                row = models.OutlineSuggestion(document_type=document_type, topic_key=key, request_count=0)
+                db.add(row)
+            row.main_topic = spellings[(document_type, key)]
+            row.request_count += count
+            row.last_requested_at = now
+        db.commit()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+        self._worker.join(timeout=self.flush_interval + 1)
+        self.flush()
+
+
+@lru_cache
+def get_popularity_recorder() -> PopularityRecorder:
+    return PopularityRecorder()
+
+
+def get_stored_outline(db: Session, document_type: str, main_topic: str) -> Optional[List[str]]:
+    row = (
+        db.query(models.OutlineSuggestion.outline)
+        .filter(
+            models.OutlineSuggestion.document_type == document_type,
+            models.OutlineSuggestion.topic_key == topic_key(main_topic),
+        )
+        .first()
+    )
+    return row.outline if row and row.outline else None
+
+
+def store_outline(db: Session, document_type: str, main_topic: str, outline: List[str]) -> None:
+    key = topic_key(main_topic)
+    for _ in range(2):
+        row = (
+            db.query(models.OutlineSuggestion)
+            .filter(models.OutlineSuggestion.document_type == document_type, models.OutlineSuggestion.topic_key == key)
+            .first()
+        )
+        if row is None:
+            row = models.OutlineSuggestion(
+                document_type=document_type, topic_key=key, main_topic=main_topic, request_count=0
+            )
+            db.add(row)
+        row.outline = outline
+        row.refreshed_at = _utcnow()
+        try:
+            db.commit()
+            return
+        except IntegrityError:
+            # The popularity flush inserted the same topic first; update that row instead
+            db.rollback()
+
+
+def parse_window(window: str) -> Tuple[int, int]:
+    """"HH:MM-HH:MM" in UTC -> (start minute, end minute) of the day."""
+    start, end = window.split("-")
+    to_minutes = lambda value: int(value.split(":")[0]) * 60 + int(value.split(":")[1])  # noqa: E731
+    return to_minutes(start), to_minutes(end)
+
+
+def in_window(now: datetime, window: str = PRECOMPUTE_WINDOW_UTC) -> bool:
+    start, end = parse_window(window)
+    minute = now.hour * 60 + now.minute
+    return start <= minute < end if start <= end else minute >= start or minute < end
+
+
+def _ledger_high_water_mark(db: Session) -> int:
+    get_usage_recorder().flush()
+    return db.query(func.coalesce(func.max(models.LLMUsage.id), 0)).scalar()
+
+
+def tokens_spent_after(db: Session, ledger_id: int) -> int:
+    """Precompute tokens recorded in the usage ledger after row ``ledger_id``."""
+    get_usage_recorder().flush()
+    total = (
+        db.query(func.coalesce(func.sum(models.LLMUsage.total_tokens), 0))
+        .filter(models.LLMUsage.operation == PRECOMPUTE_OPERATION, models.LLMUsage.id > ledger_id)
+        .scalar()
+    )
+    return int(total or 0)
+
+
+def popular_topics(db: Session, limit: int = PRECOMPUTE_TOP_K) -> List[models.OutlineSuggestion]:
+    cutoff = _utcnow() - timedelta(days=PRECOMPUTE_LOOKBACK_DAYS)
+    return (
+        db.query(models.OutlineSuggestion)
+        .filter(models.OutlineSuggestion.last_requested_at >= cutoff)
+        .order_by(models.OutlineSuggestion.request_count.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def refresh_popular_outlines(
+    db: Session,
+    top_k: int = PRECOMPUTE_TOP_K,
+    token_budget: int = PRECOMPUTE_TOKEN_BUDGET,
+) -> dict:
+    """
+    Regenerate stored outlines for the most requested topics whose outline is missing or
+    older than PRECOMPUTE_REFRESH_AFTER_HOURS, most popular first, until ``token_budget``
+    tokens (as recorded in the usage ledger) have been spent.
+    """
+    from app.services.ai_service import get_ai_service
+
+    get_popularity_recorder().flush()
+    # Ledger ids rather than timestamps: created_at is only stored at second precision
+    baseline = _ledger_high_water_mark(db)
+    stale_before = _utcnow() - timedelta(hours=PRECOMPUTE_REFRESH_AFTER_HOURS)
+    ai_client = get_ai_service()
+    refreshed = skipped = failed = 0
+    for row in popular_topics(db, top_k):
+        if row.outline and row.refreshed_at and row.refreshed_at >= stale_before:
+            skipped += 1
+            continue
+        if tokens_spent_after(db, baseline) >= token_budget:
+            break
+        try:
+            outline = ai_client.suggest_outline(row.document_type, row.main_topic, operation=PRECOMPUTE_OPERATION)
+        except Exception as exc:
+            print(f"Precompute failed for {row.document_type}:{row.topic_key}: {exc}")
+            failed += 1
+            continue
+        store_outline(db, row.document_type, row.main_topic, outline)
+        get_shared_state().delete(f"outline:{row.document_type}:{row.topic_key}")
+        refreshed += 1
+    return {
+        "refreshed": refreshed,
+        "skipped_fresh": skipped,
+        "failed": failed,
+        "tokens_spent": tokens_spent_after(db, baseline),
+        "token_budget": token_budget,
+    }
+
+
+_RUN_CLAIM_KEY = "precompute:running"
+_RUN_STATUS_KEY = "precompute:last_run"
+
+
+def _claim_run(top_k: int, token_budget: int) -> Optional[dict]:
+    """Mark a run as in progress in every worker; None if one already is."""
+    state = get_shared_state()
+    if state.incr(_RUN_CLAIM_KEY, ttl=PRECOMPUTE_RUN_TIMEOUT_SECONDS) != 1:
+        return None
+    run = {
+        "status": "running",
+        "started_at": time.time(),
+        "finished_at": None,
+        "top_k": top_k,
+        "token_budget": token_budget,
+        "result": None,
+        "error": None,
+    }
+    state.set(_RUN_STATUS_KEY, run)
+    return run
+
+
+def _execute_run(run: dict) -> dict:
+    state = get_shared_state()
+    db = SessionLocal()
+    try:
+        run["result"] = refresh_popular_outlines(db, run["top_k"], run["token_budget"])
+        run["status"] = "completed"
+    except Exception as exc:
+        run["status"], run["error"] = "failed", str(exc)
+    finally:
+        db.close()
+        run["finished_at"] = time.time()
+        state.set(_RUN_STATUS_KEY, run)
+        state.delete(_RUN_CLAIM_KEY)
+    return run
+
+
+def run_refresh(top_k: int = PRECOMPUTE_TOP_K, token_budget: int = PRECOMPUTE_TOKEN_BUDGET) -> Optional[dict]:
+    """
+    ``refresh_popular_outlines`` with its progress recorded in shared state. Returns None
+    without doing anything when a run is already in progress in any worker.
+    """
+    run = _claim_run(top_k, token_budget)
+    return _execute_run(run) if run is not None else None
+
+
+def start_refresh(top_k: int, token_budget: int) -> Optional[dict]:
+    """
+    Like ``run_refresh`` but on a background thread, so an admin request returns at once
+    instead of waiting for up to ``top_k`` LLM calls. Returns the run's initial status.
+    """
+    run = _claim_run(top_k, token_budget)
+    if run is not None:
+        threading.Thread(target=_execute_run, args=(dict(run),), name="outline-precompute-run", daemon=True).start()
+    return run
+
+
+def last_run() -> Optional[dict]:
+    return get_shared_state().get(_RUN_STATUS_KEY)
+
+
+class PrecomputeScheduler:
+    """
+    Wakes every PRECOMPUTE_CHECK_INTERVAL_SECONDS and, inside the off-peak window, runs
+    one refresh per day. The shared-state counter makes exactly one worker process win.
+    """
+
+    def __init__(self, interval: float = PRECOMPUTE_CHECK_INTERVAL_SECONDS) -> None:
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="outline-precompute", daemon=True)
+
+    def start(self) -> None:
+        self._worker.start()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            now = _utcnow()
+            if not in_window(now):
+                continue
+            claim_key = f"precompute:claimed:{now:%Y-%m-%d}"
+            if get_shared_state().incr(claim_key, ttl=2 * 86400) != 1:
+                continue
+            started = time.perf_counter()
+            run = run_refresh()
+            if run is None:
+                print("Outline precompute skipped: a run is already in progress")
+            elif run["status"] == "completed":
+                print(f"Outline precompute finished in {time.perf_counter() - started:.1f}s: {run['result']}")
+            else:  # pragma: no cover
+                print(f"Outline precompute failed: {run['error']}")
+
+    def shutdown(self) -> None:
+        self._stopped.set()
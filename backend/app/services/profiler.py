@@ -0,0 +1,355 @@
+import contextvars
+import functools
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from fastapi import HTTPException, status
+from fastapi.routing import APIRoute
+from starlette.routing import Match
+
+PROFILER_MAX_DURATION_SECONDS = int(os.getenv("PROFILER_MAX_DURATION_SECONDS", "300"))
+PROFILER_MAX_SLOW_DUMPS = int(os.getenv("PROFILER_MAX_SLOW_DUMPS", "20"))
+
+Frame = Tuple[str, str, int]  # (function name, file, first line)
+
+
+class RequestTrace:
+    """One profiled request and the stacks sampled while a thread was working on it."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.stacks: Counter = Counter()
+
+
+# Set by the middleware for the request; anyio copies it into the threadpool calls the
+# request makes (dependencies, sync endpoints, response validation).
+_current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar(
+    "profiler_trace", default=None
+)
+
+
+class ProfilingSession:
+    """
+    One admin-requested profiling window. A background thread samples the stacks of
+    every thread currently working on a selected route's request: the event loop while
+    it runs that request, and threadpool workers running its dependencies, endpoint or
+    response validation. Requests that run past ``slow_request_ms`` keep
+    their own samples as a pstats dump.
+    """
+
+    def __init__(
+        self,
+        routes: List[str],
+        duration_seconds: float,
+        max_requests: Optional[int],
+        interval_ms: float,
+        slow_request_ms: Optional[float],
+    ) -> None:
+        self.routes = routes
+        self.duration_seconds = duration_seconds
+        self.max_requests = max_requests
+        self.interval = interval_ms / 1000
+        self.interval_ms = interval_ms
+        self.slow_request_ms = slow_request_ms
+        self.started_at = time.time()
+        self.stopped_at: Optional[float] = None
+        self.requests_profiled = 0
+        self.sample_count = 0
+        self.stacks: Counter = Counter()
+        self.slow_requests: List[dict] = []
+        self._traces: List[RequestTrace] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+
+    @property
+    def active(self) -> bool:
+        return not self._stop.is_set()
+
+    def start(self) -> None:
+        self._sampler.start()
+
+    def stop(self) -> None:
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self.stopped_at = time.time()
+        if threading.current_thread() is not self._sampler:
+            self._sampler.join(timeout=1)
+
+    def matches(self, path: str) -> bool:
+        return not self.routes or any(path.startswith(route) for route in self.routes)
+
+    def enter(self, trace: RequestTrace) -> None:
+        with self._lock:
+            self._traces.append(trace)
+
+    def exit(self, trace: RequestTrace, elapsed_ms: float) -> None:
+        with self._lock:
+            self._traces.remove(trace)
+            self.requests_profiled += 1
+            if (
+                self.slow_request_ms is not None
+                and elapsed_ms >= self.slow_request_ms
+                and len(self.slow_requests) < PROFILER_MAX_SLOW_DUMPS
+            ):
+                self.slow_requests.append(
+                    {
+                        "route": trace.path,
+                        "elapsed_ms": round(elapsed_ms, 1),
+                        "captured_at": time.time(),
+                        "stats": marshal.dumps(samples_to_pstats(trace.stacks, self.interval)),
+                    }
+                )
+            reached_limit = self.max_requests is not None and self.requests_profiled >= self.max_requests
+        if reached_limit:
+            self.stop()
+
+    def _sample_loop(self) -> None:
+        deadline = self.started_at + self.duration_seconds
+        while not self._stop.wait(self.interval):
+            if time.time() >= deadline:
+                self.stop()
+                return
+            with self._lock:
+                traces = set(map(id, self._traces))
+            if not traces:
+                continue
+            for frame in sys._current_frames().values():
+                trace = _frame_trace(frame)
+                if trace is None or id(trace) not in traces:
+                    continue
+                stack: List[Frame] = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                    frame = frame.f_back
+                stack = tuple(reversed(stack))
+                self.stacks[stack] += 1
+                trace.stacks[stack] += 1
+                self.sample_count += 1
+
+    def status(self) -> dict:
+        return {
+            "active": self.active,
+            "routes": self.routes,
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at,
+            "duration_seconds": self.duration_seconds,
+            "max_requests": self.max_requests,
+            "requests_profiled": self.requests_profiled,
+            "samples": self.sample_count,
+            "slow_requests": [
+                {"index": idx, "route": item["route"], "elapsed_ms": item["elapsed_ms"]}
+                for idx, item in enumerate(self.slow_requests)
+            ],
+        }
+
+    def collapsed(self) -> str:
+        lines = []
+        for stack, count in self.stacks.most_common():
+            names = ";".join(f"{name} ({os.path.basename(path)}:{line})" for name, path, line in stack)
+            lines.append(f"{names} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> dict:
+        frame_index: Dict[Frame, int] = {}
+        frames: List[dict] = []
+        samples: List[List[int]] = []
+        weights: List[float] = []
+        for stack, count in self.stacks.items():
+            indices = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                indices.append(frame_index[frame])
+            samples.append(indices)
+            weights.append(count * self.interval_ms)
+        total = sum(weights)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": ", ".join(self.routes) or "all routes",
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": total,
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+            "exporter": "ai-doc-platform",
+        }
+
+
+_session: Optional[ProfilingSession] = None
+_session_lock = threading.Lock()
+
+
+def start_session(
+    routes: List[str],
+    duration_seconds: float,
+    max_requests: Optional[int] = None,
+    interval_ms: float = 10,
+    slow_request_ms: Optional[float] = None,
+) -> ProfilingSession:
+    global _session
+    if duration_seconds <= 0 or duration_seconds > PROFILER_MAX_DURATION_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"duration_seconds must be between 1 and {PROFILER_MAX_DURATION_SECONDS}.",
+        )
+    with _session_lock:
+        if _session is not None and _session.active:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A profiling session is already running.",
+            )
+        _session = ProfilingSession(routes, duration_seconds, max_requests, interval_ms, slow_request_ms)
+        _session.start()
+        return _session
+
+
+def get_session() -> ProfilingSession:
+    if _session is None:
+        raise HTTPException(status_code=404, detail="No profiling session has been started")
+    return _session
+
+
+def get_slow_request_stats(session: ProfilingSession, index: int) -> bytes:
+    if index < 0 or index >= len(session.slow_requests):
+        raise HTTPException(status_code=404, detail="Slow request dump not found")
+    return session.slow_requests[index]["stats"]
+
+
+def _worker_run_code():
+    try:
+        from anyio._backends._asyncio import WorkerThread
+    except ImportError:  # pragma: no cover
+        return None
+    return WorkerThread.run.__code__
+
+
+_WORKER_RUN_CODE = _worker_run_code()
+
+
+def _callable_code(func):
+    while isinstance(func, functools.partial):
+        func = func.func
+    code = getattr(func, "__code__", None)
+    return code if code is not None else getattr(getattr(type(func), "__call__", None), "__code__", None)
+
+
+def _frame_trace(frame) -> Optional[RequestTrace]:
+    """
+    The request a thread is working on, if any. On the event loop thread that is the
+    request whose task is running right now (the middleware's frame is on the stack);
+    on a threadpool worker it is read from the contextvars Context anyio runs the call
+    in, but only while the call itself is executing: idle workers keep their last item's
+    locals while they wait for the next one.
+    """
+    child = None
+    while frame is not None:
+        code = frame.f_code
+        if code is _MIDDLEWARE_CODE:
+            return frame.f_locals.get("trace")
+        if code is _WORKER_RUN_CODE:
+            local_vars = frame.f_locals
+            context = local_vars.get("context")
+            if not isinstance(context, contextvars.Context):
+                return None
+            if child is not None and child.f_code is not _callable_code(local_vars.get("func")):
+                return None
+            return context.get(_current_trace)
+        child, frame = frame, frame.f_back
+    return None
+
+
+def samples_to_pstats(stacks: Counter, interval: float) -> dict:
+    """
+    Build a pstats-compatible table from sampled stacks so the dump opens in pstats,
+    snakeviz and friends. Times are sample counts times the interval; call counts are
+    sample counts.
+    """
+    stats: Dict[Tuple[str, int, str], list] = {}
+    for stack, count in stacks.items():
+        elapsed = count * interval
+        seen = set()
+        caller_key = None
+        for depth, (name, path, line) in enumerate(stack):
+            key = (path, line, name)
+            entry = stats.setdefault(key, [0, 0, 0.0, 0.0, {}])
+            if key not in seen:  # Recursion counts once toward cumulative time
+                seen.add(key)
+                entry[0] += count
+                entry[1] += count
+                entry[3] += elapsed
+            if depth == len(stack) - 1:
+                entry[2] += elapsed
+            if caller_key is not None:
+                calls, primitive, own, cumulative = entry[4].get(caller_key, (0, 0, 0.0, 0.0))
+                own_time = elapsed if depth == len(stack) - 1 else 0.0
+                entry[4][caller_key] = (calls + count, primitive + count, own + own_time, cumulative + elapsed)
+            caller_key = key
+    return {key: (cc, nc, tt, ct, callers) for key, (cc, nc, tt, ct, callers) in stats.items()}
+
+
+def _route_path(scope) -> Optional[str]:
+    """The matched route's path template (e.g. "/api/projects/{project_id}"), as sessions select on it."""
+    app = scope.get("app")
+    for route in getattr(getattr(app, "router", None), "routes", []):
+        if isinstance(route, APIRoute) and route.matches(scope)[0] == Match.FULL:
+            return route.path
+    return None
+
+
+class ProfilingMiddleware:
+    """
+    Request-level profiling hook: covers dependency resolution, the endpoint, response
+    validation and serialization, and sending the body. A single ``is None`` check when
+    no session is armed.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        session = _session
+        if session is None or scope["type"] != "http" or not session.active:
+            await self.app(scope, receive, send)
+            return
+        path = _route_path(scope)
+        if path is None or not session.matches(path):
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace(path)
+        token = _current_trace.set(trace)
+        session.enter(trace)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_trace.reset(token)
+            session.exit(trace, (time.perf_counter() - started) * 1000)
+
+
+_MIDDLEWARE_CODE = ProfilingMiddleware.__call__.__code__
+
+
+def stats_to_text(stats: bytes, limit: int = 40) -> str:
+    buffer = io.StringIO()
+    report = pstats.Stats(stream=buffer)
+    report.stats = marshal.loads(stats)
+    report.get_top_level_stats()
+    report.sort_stats("cumulative").print_stats(limit)
+    return buffer.getvalue()
@@ -0,0 +1,154 @@
+import re
+from typing import Iterable, List
+from fastapi import HTTPException, status
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app import models
+
+# Rows are keyed by rowid so updates never scan the index: sections use their own id and
+# projects use the negated project id. ``owner`` holds a "u<user_id>" token so the MATCH
+# itself is scoped to one user and only that user's hits are ranked.
+CREATE_INDEX_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+    "kind UNINDEXED, project_id UNINDEXED, section_id UNINDEXED, "
+    "owner, title, body, tokenize = 'porter unicode61')"
+)
+
+SEARCH_SQL = text(
+    """
+    SELECT kind, project_id, section_id,
+           highlight(search_index, 4, '[', ']') AS title,
+           snippet(search_index, 5, '[', ']', '…', 16) AS snippet,
+           bm25(search_index, 0.0, 0.0, 0.0, 0.0, 4.0, 1.0) AS rank
+    FROM search_index
+    WHERE search_index MATCH :query
+    ORDER BY rank
+    LIMIT :limit
+    """
+)
+
+UPSERT_SQL = text(
+    "INSERT OR REPLACE INTO search_index (rowid, kind, project_id, section_id, owner, title, body) "
+    "VALUES (:rowid, :kind, :project_id, :section_id, 'u' || :user_id, :title, :body)"
+)
+
+DELETE_SQL = text("DELETE FROM search_index WHERE rowid = :rowid")
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def is_supported(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def ensure_search_index(engine: Engine) -> None:
+    """Create the FTS5 table, backfilling it from existing rows the first time it is created."""
+    if not is_supported(engine):
+        return
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'")
+        ).first()
+        conn.execute(text(CREATE_INDEX_SQL))
+        if not exists:
+            conn.execute(
+                text(
+                    "INSERT INTO search_index (rowid, kind, project_id, section_id, owner, title, body) "
+                    "SELECT -id, 'project', id, NULL, 'u' || user_id, title, main_topic FROM projects"
+                )
+            )
+            conn.execute(
+                text(
+                    "INSERT INTO search_index (rowid, kind, project_id, section_id, owner, title, body) "
+                    "SELECT s.id, 'section', p.id, s.id, 'u' || p.user_id, s.title, COALESCE(s.content, '') "
+                    "FROM sections s JOIN projects p ON p.id = s.project_id"
+                )
+            )
+
+
+def index_sections(db: Session, project: models.Project, sections: Iterable[models.Section]) -> None:
+    """Upsert index rows for the given sections within the caller's transaction."""
+    if not is_supported(db.get_bind()):
+        return
+    rows = [
+        {
+            "rowid": section.id,
+            "kind": "section",
+            "user_id": project.user_id,
+            "project_id": project.id,
+            "section_id": section.id,
+            "title": section.title,
+            "body": section.content or "",
+        }
+        for section in sections
+    ]
+    if rows:
+        db.execute(UPSERT_SQL, rows)
+
+
+def index_project(db: Session, project: models.Project) -> None:
+    if not is_supported(db.get_bind()):
+        return
+    db.execute(
+        UPSERT_SQL,
+        {
+            "rowid": -project.id,
+            "kind": "project",
+            "user_id": project.user_id,
+            "project_id": project.id,
+            "section_id": None,
+            "title": project.title,
+            "body": project.main_topic,
+        },
+    )
+
+
+def remove_sections(db: Session, section_ids: Iterable[int]) -> None:
+    if not is_supported(db.get_bind()):
+        return
+    rows = [{"rowid": section_id} for section_id in section_ids]
+    if rows:
+        db.execute(DELETE_SQL, rows)
+
+
+def remove_project(db: Session, project_id: int, section_ids: Iterable[int]) -> None:
+    remove_sections(db, section_ids)
+    if is_supported(db.get_bind()):
+        db.execute(DELETE_SQL, {"rowid": -project_id})
+
+
+def build_match_query(user_id: int, query: str) -> str:
+    """
+    Turn free text into a safe FTS5 query over title and body: every term must match, the
+    last one as a prefix, restricted to rows owned by ``user_id``.
+    """
+    terms = _TOKEN_RE.findall(query)
+    if not terms:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Search query is empty")
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return f'owner : "u{int(user_id)}" AND {{title body}} : ({" ".join(quoted)})'
+
+
+
+def search(db: Session, user_id: int, query: str, limit: int = 20) -> List[dict]:
+    if not is_supported(db.get_bind()):
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Full-text search requires the SQLite FTS5 backend",
+        )
+    rows = db.execute(
+        SEARCH_SQL, {"query": build_match_query(user_id, query), "limit": limit}
+    ).mappings()
+    return [
+        {
+            "kind": row["kind"],
+            "project_id": row["project_id"],
+            "section_id": row["section_id"],
+            "title": row["title"],
+            "snippet": row["snippet"],
+            "score": round(-row["rank"], 4),
+        }
+        for row in rows
+    ]
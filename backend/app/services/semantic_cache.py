@@ -0,0 +1,219 @@
+import hashlib
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.85"))
+SEMANTIC_CACHE_DIMENSIONS = int(os.getenv("SEMANTIC_CACHE_DIMENSIONS", "256"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "100000"))
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_ORDINALS = {"first": "1", "second": "2", "third": "3", "fourth": "4"}
+_QUARTER_RE = re.compile(r"\b(first|second|third|fourth|[1-4])(?:st|nd|rd|th)? quarter\b")
+_STOPWORDS = {"a", "an", "the", "of", "for", "and", "on", "in", "to", "our", "about"}
+_MIN_VARIANT_LENGTH = 5
+_CANDIDATES = 5
+
+
+def _singular(word: str) -> str:
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def normalize_topic(topic: str) -> str:
+    """Lowercase, fold quarter spellings ("third quarter" -> "q3"), drop filler words and plurals."""
+    text = topic.lower()
+    text = _QUARTER_RE.sub(lambda match: f"q{_ORDINALS.get(match.group(1), match.group(1))}", text)
+    return " ".join(_singular(word) for word in _WORD_RE.findall(text) if word not in _STOPWORDS)
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    # Substitution, or insertion into the shorter word
+    return a[i + 1 :] == b[i + 1 :] if len(a) == len(b) else a[i:] == b[i + 1 :]
+
+
+def _is_variant(word: str, others: set) -> bool:
+    """A typo of a longer plain word; numbers and short words (often names) never are."""
+    if len(word) < _MIN_VARIANT_LENGTH or any(char.isdigit() for char in word):
+        return False
+    return any(
+        len(other) >= _MIN_VARIANT_LENGTH and not any(char.isdigit() for char in other) and _within_one_edit(word, other)
+        for other in others
+    )
+
+
+def same_subject(normalized_a: str, normalized_b: str) -> bool:
+    """
+    Cosine similarity weighs every word equally, so two long topics that differ only in a
+    company, country or year still score above the threshold. Topics arrive in any casing,
+    so names cannot be told apart from other words; instead every content word must
+    appear in both topics, up to a one-letter typo, and numbers must match exactly.
+    """
+    words_a, words_b = set(normalized_a.split()), set(normalized_b.split())
+    return all(_is_variant(word, words_b) for word in words_a - words_b) and all(
+        _is_variant(word, words_a) for word in words_b - words_a
+    )
+
+
+def _bucket(feature: str, dimensions: int) -> Tuple[int, float]:
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+    value = int.from_bytes(digest, "little")
+    return value % dimensions, 1.0 if (value >> 63) else -1.0
+
+
+def embed(normalized_topic: str, dimensions: int = SEMANTIC_CACHE_DIMENSIONS) -> np.ndarray:
+    """
+    Signed hashing vectorizer over whole words plus character trigrams, L2-normalized so a
+    dot product is the cosine similarity. Trigrams keep word variants and small typos close.
+    """
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for word in normalized_topic.split():
+        index, sign = _bucket(f"w:{word}", dimensions)
+        vector[index] += 2.0 * sign
+        padded = f" {word} "
+        for start in range(len(padded) - 2):
+            index, sign = _bucket(f"c:{padded[start:start + 3]}", dimensions)
+            vector[index] += sign
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+def subject_key(normalized_topic: str) -> str:
+    """Topics with the same content words, in any order, share a key and need no vector scan."""
+    return " ".join(sorted(set(normalized_topic.split())))
+
+
+def _could_be_variant(normalized_topic: str) -> bool:
+    """Only words that can be a typo of another (see ``_is_variant``) let two different keys match."""
+    return any(
+        len(word) >= _MIN_VARIANT_LENGTH and not any(char.isdigit() for char in word)
+        for word in normalized_topic.split()
+    )
+
+
+class OutlineVectorIndex:
+    """
+    Brute-force cosine index over a preallocated float32 matrix, plus a dict from subject
+    key to slot for exact word matches. Once ``max_entries`` is reached the oldest slots
+    are overwritten, so memory stays at ``max_entries * dimensions * 4`` bytes.
+
+    Slots hold (outline, normalized topic) tuples that are replaced whole, so a scan over
+    a snapshot that races with ``add`` can see a stale vector but never an outline paired
+    with another entry's topic.
+    """
+
+    def __init__(self, dimensions: int, max_entries: int) -> None:
+        self.dimensions = dimensions
+        self.max_entries = max_entries
+        self._vectors = np.zeros((min(1024, max_entries), dimensions), dtype=np.float32)
+        self._entries: List[Optional[Tuple[List[str], Optional[str]]]] = [None] * self._vectors.shape[0]
+        self._slots: Dict[str, int] = {}
+        self._size = 0
+        self._cursor = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _grow(self) -> None:
+        capacity = min(self._vectors.shape[0] * 2, self.max_entries)
+        vectors = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        vectors[: self._vectors.shape[0]] = self._vectors
+        self._entries.extend([None] * (capacity - len(self._entries)))
+        self._vectors = vectors
+
+    def add(self, vector: np.ndarray, outline: List[str], topic: Optional[str] = None) -> None:
+        if self._cursor == self._vectors.shape[0] and self._vectors.shape[0] < self.max_entries:
+            self._grow()
+        if self._cursor == self.max_entries:
+            self._cursor = 0
+        evicted = self._entries[self._cursor]
+        if evicted is not None and evicted[1] is not None:
+            key = subject_key(evicted[1])
+            if self._slots.get(key) == self._cursor:
+                del self._slots[key]
+        self._vectors[self._cursor] = vector
+        self._entries[self._cursor] = (outline, topic)
+        if topic is not None:
+            self._slots[subject_key(topic)] = self._cursor
+        self._cursor += 1
+        self._size = min(self._size + 1, self.max_entries)
+
+    def exact(self, key: str) -> Optional[List[str]]:
+        slot = self._slots.get(key)
+        return self._entries[slot][0] if slot is not None else None
+
+    def snapshot(self) -> Tuple[np.ndarray, list]:
+        """The filled part of the matrix and the slot list, for a scan outside the cache lock."""
+        return self._vectors[: self._size], self._entries
+
+    @staticmethod
+    def nearest(
+        snapshot: Tuple[np.ndarray, list], vector: np.ndarray, threshold: float, count: int = 1
+    ) -> List[Tuple[List[str], Optional[str], float]]:
+        """Up to ``count`` entries scoring at least ``threshold``, as (outline, normalized topic, score), best first."""
+        vectors, entries = snapshot
+        if not len(vectors):
+            return []
+        scores = vectors @ vector
+        # Few entries clear the threshold, so filtering first avoids a partial sort of all scores
+        above = np.flatnonzero(scores >= threshold)
+        best = above[np.argsort(-scores[above])][:count]
+        return [(*entries[idx], float(scores[idx])) for idx in best if entries[idx] is not None]
+
+
+class SemanticOutlineCache:
+    """Near-duplicate cache for outline suggestions, with one index per document type."""
+
+    def __init__(
+        self,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        dimensions: int = SEMANTIC_CACHE_DIMENSIONS,
+        max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.threshold = threshold
+        self.dimensions = dimensions
+        self.max_entries = max_entries
+        self._indexes: Dict[str, OutlineVectorIndex] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, document_type: str, main_topic: str) -> Optional[List[str]]:
+        index = self._indexes.get(document_type)
+        if index is None:
+            return None
+        normalized = normalize_topic(main_topic)
+        # same_subject only accepts the same content words up to one-letter typos, so most
+        # hits are a dict lookup; the vector scan is the typo-tolerant fallback
+        with self._lock:
+            outline = index.exact(subject_key(normalized))
+            if outline is not None or not _could_be_variant(normalized):
+                return outline
+            snapshot = index.snapshot()
+        candidates = index.nearest(snapshot, embed(normalized, self.dimensions), self.threshold, _CANDIDATES)
+        for outline, topic, _ in candidates:
+            if outline is not None and topic is not None and same_subject(normalized, topic):
+                return outline
+        return None
+
+    def store(self, document_type: str, main_topic: str, outline: List[str]) -> None:
+        normalized = normalize_topic(main_topic)
+        vector = embed(normalized, self.dimensions)
+        with self._lock:
+            if document_type not in self._indexes:
+                self._indexes[document_type] = OutlineVectorIndex(self.dimensions, self.max_entries)
+            self._indexes[document_type].add(vector, outline, normalized)
+
+
+@lru_cache
+def get_semantic_cache() -> SemanticOutlineCache:
+    return SemanticOutlineCache()
@@ -0,0 +1,157 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+SHARED_STATE_URL = os.getenv("SHARED_STATE_URL", "memory://")
+
+
+class SharedState:
+    """
+    Small key/value interface for caches and counters that must be consistent across
+    uvicorn workers. Values must be JSON-serializable; ``ttl`` is in seconds.
+    """
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """Atomically add ``amount`` and return the new value. ``ttl`` applies when the key is created."""
+        raise NotImplementedError
+
+
+def _expiry(ttl: Optional[float]) -> Optional[float]:
+    return time.time() + ttl if ttl is not None else None
+
+
+class MemoryState(SharedState):
+    """Process-local backend; the default for single-worker and development setups."""
+
+    def __init__(self) -> None:
+        self._data: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.time():
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._live(key)
+            return entry[0] if entry else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = (value, _expiry(ttl))
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                entry = (0, _expiry(ttl))
+            value = int(entry[0]) + amount
+            self._data[key] = (value, entry[1])
+            return value
+
+
+class SQLiteState(SharedState):
+    """
+    Backend stored in a local SQLite file in WAL mode, so every worker process on the
+    host sees the same cache entries and counters.
+    """
+
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS shared_state "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _maybe_purge(self, conn: sqlite3.Connection) -> None:
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            conn.execute("DELETE FROM shared_state WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._connection().execute(
+            "SELECT value FROM shared_state WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time()),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        conn = self._connection()
+        conn.execute(
+            "INSERT INTO shared_state (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+            (key, json.dumps(value), _expiry(ttl)),
+        )
+        self._maybe_purge(conn)
+
+    def delete(self, key: str) -> None:
+        self._connection().execute("DELETE FROM shared_state WHERE key = ?", (key,))
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value, expires_at FROM shared_state WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (row[1] is not None and row[1] <= now):
+                value, expires_at = amount, _expiry(ttl)
+            else:
+                value, expires_at = int(json.loads(row[0])) + amount, row[1]
+            conn.execute(
+                "INSERT OR REPLACE INTO shared_state (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._maybe_purge(conn)
+        return value
+
+
+def create_shared_state(url: str) -> SharedState:
+    if url.startswith("memory://"):
+        return MemoryState()
+    if url.startswith("sqlite:///"):
+        return SQLiteState(url[len("sqlite:///"):])
+    raise RuntimeError(f"Unsupported SHARED_STATE_URL: {url}")
+
+
+@lru_cache
+def get_shared_state() -> SharedState:
+    return create_shared_state(SHARED_STATE_URL)
@@ -0,0 +1,155 @@
+import os
+import queue
+import threading
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app import models
+from app.database import SessionLocal
+
+USAGE_BATCH_SIZE = int(os.getenv("USAGE_BATCH_SIZE", "50"))
+USAGE_FLUSH_INTERVAL_SECONDS = float(os.getenv("USAGE_FLUSH_INTERVAL_SECONDS", "2.0"))
+
+# USD per 1M tokens as (prompt, completion), keyed by model family; dated snapshots match
+# by prefix. Unknown models are reported with zero cost.
+MODEL_PRICING = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+
+
+@dataclass
+class UsageRecord:
+    operation: str
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    latency_ms: int
+    user_id: Optional[int] = None
+    project_id: Optional[int] = None
+
+
+def model_pricing(model: str) -> Tuple[float, float]:
+    """
+    Prices for ``model`` by longest matching prefix. The API reports the dated snapshot it
+    served (e.g. "gpt-4o-mini-2024-07-18"), which must price as "gpt-4o-mini", not "gpt-4o".
+    """
+    matches = [name for name in MODEL_PRICING if model == name or model.startswith(f"{name}-")]
+    return MODEL_PRICING[max(matches, key=len)] if matches else (0.0, 0.0)
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prompt_price, completion_price = model_pricing(model)
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+class UsageRecorder:
+    """
+    Buffers usage records in memory and writes them to the ledger in batches from a
+    background thread, so LLM calls never wait on an extra database round-trip.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = USAGE_BATCH_SIZE,
+        flush_interval: float = USAGE_FLUSH_INTERVAL_SECONDS,
+    ) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[UsageRecord]" = queue.Queue()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="usage-recorder", daemon=True)
+        self._worker.start()
+
+    def record(self, record: UsageRecord) -> None:
+        self._queue.put_nowait(record)
+
+    def _drain(self) -> List[UsageRecord]:
+        batch: List[UsageRecord] = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self) -> int:
+        """Write every pending record and return how many rows were inserted."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._drain()
+                if not batch:
+                    return written
+                db = SessionLocal()
+                try:
+                    db.bulk_insert_mappings(models.LLMUsage, [asdict(record) for record in batch])
+                    db.commit()
+                    written += len(batch)
+                except Exception as exc:  # pragma: no cover
+                    db.rollback()
+                    print(f"Usage ledger flush failed, dropping {len(batch)} records: {exc}")
+                finally:
+                    db.close()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+        self._worker.join(timeout=self.flush_interval + 1)
+        self.flush()
+
+
+@lru_cache
+def get_usage_recorder() -> UsageRecorder:
+    return UsageRecorder()
+
+
+def summarize_usage(db: Session, *filters) -> dict:
+    """Aggregate ledger rows matching ``filters`` into totals plus a per-model/operation breakdown."""
+    rows = (
+        db.query(
+            models.LLMUsage.model,
+            models.LLMUsage.operation,
+            func.count(models.LLMUsage.id),
+            func.coalesce(func.sum(models.LLMUsage.prompt_tokens), 0),
+            func.coalesce(func.sum(models.LLMUsage.completion_tokens), 0),
+            func.coalesce(func.sum(models.LLMUsage.total_tokens), 0),
+            func.coalesce(func.avg(models.LLMUsage.latency_ms), 0),
+        )
+        .filter(*filters)
+        .group_by(models.LLMUsage.model, models.LLMUsage.operation)
+        .all()
+    )
+
+    breakdown = []
+    for model, operation, calls, prompt_tokens, completion_tokens, total_tokens, avg_latency in rows:
+        breakdown.append(
+            {
+                "model": model,
+                "operation": operation,
+                "calls": calls,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": total_tokens,
+                "avg_latency_ms": round(float(avg_latency), 1),
+                "estimated_cost_usd": round(estimate_cost(model, prompt_tokens, completion_tokens), 6),
+            }
+        )
+
+    return {
+        "calls": sum(item["calls"] for item in breakdown),
+        "prompt_tokens": sum(item["prompt_tokens"] for item in breakdown),
+        "completion_tokens": sum(item["completion_tokens"] for item in breakdown),
+        "total_tokens": sum(item["total_tokens"] for item in breakdown),
+        "estimated_cost_usd": round(sum(item["estimated_cost_usd"] for item in breakdown), 6),
+        "breakdown": breakdown,
+    }
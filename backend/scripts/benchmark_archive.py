@@ -0,0 +1,166 @@
+"""
+Archive size report: builds a throwaway SQLite database of projects with generated
+sections and refinement history, archives the cold share of them, and reports the
+database size before and after along with the per-codec compression ratio and the
+latency of a transparent restore.
+
+Usage (from ``backend/``):
+    python scripts/benchmark_archive.py [--projects 2000] [--cold-fraction 0.8]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SUBJECTS = "Revenue,Churn,The pipeline,Gross margin,Onboarding time,Headcount,Cloud spend,Net retention".split(",")
+VERBS = "grew,declined,held steady,improved,slipped,recovered,outperformed plan,missed target".split(",")
+CONTEXTS = (
+    "in the enterprise segment,across EMEA,after the pricing change,for new customers,"
+    "in the partner channel,quarter over quarter,against the prior forecast,in North America"
+).split(",")
+
+
+def _paragraph(rng: random.Random, sentences: int) -> str:
+    return " ".join(
+        f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} by {rng.randint(1, 40)}% {rng.choice(CONTEXTS)}."
+        for _ in range(sentences)
+    )
+
+
+def _content(rng: random.Random) -> str:
+    bullets = "\n".join(f"- {_paragraph(rng, 1)}" for _ in range(rng.randint(2, 5)))
+    return f"{_paragraph(rng, rng.randint(3, 6))}\n\n{bullets}\n\n{_paragraph(rng, rng.randint(2, 4))}"
+
+
+def _db_bytes(engine) -> int:
+    from sqlalchemy import text
+
+    with engine.connect() as conn:
+        conn.execute(text("VACUUM"))
+        page_count = conn.execute(text("PRAGMA page_count")).scalar()
+        page_size = conn.execute(text("PRAGMA page_size")).scalar()
+    return page_count * page_size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report the size reduction from archiving cold projects.")
+    parser.add_argument("--projects", type=int, default=2000)
+    parser.add_argument("--sections-per-project", type=int, default=8)
+    parser.add_argument("--refinements-per-section", type=int, default=3)
+    parser.add_argument("--cold-fraction", type=float, default=0.8)
+    parser.add_argument("--restores", type=int, default=50)
+    options = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/archive_bench.db"
+
+    from sqlalchemy import insert
+    from app import models
+    from app.database import SessionLocal, engine, init_db
+    from app.services import archive
+
+    init_db()
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    cold_count = int(options.projects * options.cold_fraction)
+    sections, refinements = [], []
+    for pid in range(1, options.projects + 1):
+        touched = now - timedelta(days=400 if pid <= cold_count else 1)
+        for idx in range(options.sections_per_project):
+            section_id = len(sections) + 1
+            content = _content(rng)
+            sections.append(
+                {
+                    "id": section_id,
+                    "project_id": pid,
+                    "section_type": "section",
+                    "title": f"{rng.choice(SUBJECTS)} update",
+                    "content": content,
+                    "order_index": idx,
+                    "created_at": touched,
+                    "updated_at": touched,
+                }
+            )
+            for _ in range(options.refinements_per_section):
+                refined = _content(rng)
+                refinements.append(
+                    {
+                        "project_id": pid,
+                        "section_id": section_id,
+                        "prompt": "Make this more concise",
+                        "original_content": content,
+                        "refined_content": refined,
+                        "created_at": touched,
+                    }
+                )
+                content = refined
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [{"id": 1, "email": "bench@example.com", "hashed_password": "x"}])
+        conn.execute(
+            insert(models.Project),
+            [
+                {
+                    "id": pid,
+                    "user_id": 1,
+                    "title": f"Project {pid}",
+                    "document_type": "docx",
+                    "main_topic": _paragraph(rng, 1),
+                    "created_at": now - timedelta(days=400 if pid <= cold_count else 1),
+                }
+                for pid in range(1, options.projects + 1)
+            ],
+        )
+        conn.execute(insert(models.Section), sections)
+        conn.execute(insert(models.Refinement), refinements)
+    before = _db_bytes(engine)
+    print(
+        f"{options.projects} projects, {len(sections)} sections, {len(refinements)} refinements; "
+        f"{cold_count} projects inactive for 400 days"
+    )
+
+    db = SessionLocal()
+    codecs = ["zlib"] + (["zstd"] if archive._zstd() is not None else [])
+    payloads = [
+        json.dumps(archive.archive_payload(db, project_id), separators=(",", ":")).encode("utf-8")
+        for project_id in range(1, min(cold_count, 200) + 1)
+    ]
+    raw_total = sum(len(payload) for payload in payloads)
+    for codec in codecs:
+        started = time.perf_counter()
+        stored_total = sum(len(archive.compress(payload, codec)) for payload in payloads)
+        elapsed = (time.perf_counter() - started) * 1000 / max(len(payloads), 1)
+        print(
+            f"{codec:>5}: {raw_total / max(stored_total, 1):5.1f}x smaller on {len(payloads)} projects "
+            f"({raw_total / 1024:,.0f} KiB -> {stored_total / 1024:,.0f} KiB), {elapsed:.2f} ms per project"
+        )
+
+    started = time.perf_counter()
+    result = archive.archive_inactive_projects(db, inactive_days=90, limit=options.projects)
+    archive_seconds = time.perf_counter() - started
+    after = _db_bytes(engine)
+    print(f"archived {result['archived']} projects in {archive_seconds:.1f}s with {archive.resolve_codec()}")
+    print(f"database size: {before / 1024 / 1024:,.1f} MiB -> {after / 1024 / 1024:,.1f} MiB ({after / before:.0%})")
+
+    restore_ms = []
+    for project_id in rng.sample(range(1, cold_count + 1), min(options.restores, cold_count)):
+        project = db.get(models.Project, project_id)
+        started = time.perf_counter()
+        archive.ensure_restored(db, project)
+        restore_ms.append((time.perf_counter() - started) * 1000)
+    if restore_ms:
+        print(
+            f"transparent restore: median {statistics.median(restore_ms):.1f} ms, "
+            f"max {max(restore_ms):.1f} ms over {len(restore_ms)} projects"
+        )
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
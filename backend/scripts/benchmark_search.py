@@ -0,0 +1,106 @@
+"""
+Search latency benchmark: builds a throwaway SQLite database with N sections spread over
+many users, then times /api/search queries at the service layer.
+
+Usage (from ``backend/``):
+    python scripts/benchmark_search.py [--sections 100000] [--users 500]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = (
+    "revenue pipeline churn forecast margin customer onboarding retention pricing roadmap "
+    "hiring budget compliance security migration platform analytics growth quarter region "
+    "partner launch campaign supply logistics inventory risk audit strategy vendor cost"
+).split()
+
+
+def _text(rng: random.Random, length: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark full-text search latency.")
+    parser.add_argument("--sections", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--sections-per-project", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    options = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/search_bench.db"
+
+    from sqlalchemy import insert
+    from app import models
+    from app.database import SessionLocal, engine, init_db
+    from app.services import search_index
+
+    models.Base.metadata.create_all(bind=engine)
+    rng = random.Random(7)
+    project_count = options.sections // options.sections_per_project
+    with engine.begin() as conn:
+        conn.execute(
+            insert(models.User),
+            [{"id": uid, "email": f"user{uid}@example.com", "hashed_password": "x"} for uid in range(1, options.users + 1)],
+        )
+        conn.execute(
+            insert(models.Project),
+            [
+                {
+                    "id": pid,
+                    "user_id": rng.randint(1, options.users),
+                    "title": _text(rng, 3),
+                    "document_type": "docx",
+                    "main_topic": _text(rng, 6),
+                }
+                for pid in range(1, project_count + 1)
+            ],
+        )
+        conn.execute(
+            insert(models.Section),
+            [
+                {
+                    "project_id": (idx // options.sections_per_project) + 1,
+                    "section_type": "section",
+                    "title": _text(rng, 4),
+                    "content": _text(rng, 120),
+                    "order_index": idx % options.sections_per_project,
+                }
+                for idx in range(options.sections)
+            ],
+        )
+
+    started = time.perf_counter()
+    init_db()  # creates and backfills the FTS5 index
+    print(f"indexed {options.sections} sections in {time.perf_counter() - started:.2f}s")
+
+    db = SessionLocal()
+    for label, make_query in (
+        ("single term", lambda: rng.choice(WORDS)),
+        ("two terms", lambda: f"{rng.choice(WORDS)} {rng.choice(WORDS)}"),
+        ("prefix", lambda: rng.choice(WORDS)[:4]),
+    ):
+        timings = []
+        for _ in range(options.queries):
+            user_id = rng.randint(1, options.users)
+            query = make_query()
+            started = time.perf_counter()
+            search_index.search(db, user_id, query, 20)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        print(
+            f"{label:>12}: p50 {statistics.median(timings):.2f} ms, "
+            f"p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms"
+        )
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Semantic outline cache benchmark: hit rate on paraphrased topics and lookup latency with
+the index filled to N entries.
+
+Filler entries are random unit vectors (scan cost only depends on index size); the
+hit-rate probes are real embedded topics and paraphrases of them, plus unrelated topics
+that must miss, and near misses that share every word but the entity (company, country,
+year) and must miss too, since the cache is shared by every user.
+
+Usage (from ``backend/``):
+    python scripts/benchmark_semantic_cache.py [--entries 1000000] [--dimensions 256]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+from app.services.semantic_cache import SEMANTIC_CACHE_THRESHOLD, SemanticOutlineCache  # noqa: E402
+
+SUBJECTS = [
+    "sales review", "marketing plan", "product roadmap", "hiring plan", "budget forecast",
+    "customer retention strategy", "cloud migration", "security audit", "vendor assessment",
+    "pricing strategy", "supply chain risk", "investor update", "employee onboarding",
+    "partner program", "data governance policy", "brand refresh", "market entry analysis",
+]
+SCOPES = ["EMEA", "APAC", "North America", "retail", "enterprise", "SMB", "healthcare", "fintech"]
+NEAR_MISSES = [
+    ("Quarterly sales review for Acme Corp", "Quarterly sales review for Globex Corp"),
+    ("Market entry analysis for the industrial division in Germany", "Market entry analysis for the industrial division in France"),
+    ("Q3 2024 EMEA sales review", "Q3 2025 EMEA sales review"),
+    ("Q3 2024 EMEA sales review", "Q3 2024 APAC sales review"),
+    ("Board update for Initech leadership offsite", "Board update for Initrode leadership offsite"),
+    ("Annual compliance training for Contoso employees", "Annual compliance training for Fabrikam employees"),
+]
+QUARTERS = [("Q1", "First quarter"), ("Q2", "Second quarter"), ("Q3", "Third quarter"), ("Q4", "Fourth quarter")]
+
+
+def _topic_pairs(rng: random.Random, count: int):
+    """Yield (cached topic, paraphrase) pairs using the rewrites users actually make."""
+    seen = set()
+    while len(seen) < count:
+        subject, scope = rng.choice(SUBJECTS), rng.choice(SCOPES)
+        short, long = rng.choice(QUARTERS)
+        year = rng.randint(2020, 2030)
+        key = (subject, scope, short, year)
+        if key in seen:
+            continue
+        seen.add(key)
+        cached = f"{short} {year} {scope} {subject}"
+        paraphrase = rng.choice(
+            [
+                f"{long} {year} {scope} {subject}",
+                f"The {short} {year} {scope} {subject}s",
+                f"{short} {year} {subject} for {scope}",
+                f"{short.lower()} {year} {scope.lower()} {subject.title()}",
+            ]
+        )
+        yield cached, paraphrase
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the semantic outline cache.")
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--dimensions", type=int, default=256)
+    parser.add_argument("--probes", type=int, default=2000)
+    parser.add_argument("--threshold", type=float, default=SEMANTIC_CACHE_THRESHOLD)
+    options = parser.parse_args()
+
+    rng = random.Random(11)
+    cache = SemanticOutlineCache(options.threshold, options.dimensions, options.entries)
+    pairs = list(_topic_pairs(rng, options.probes))
+
+    filler = options.entries - len(pairs)
+    matrix_rng = np.random.default_rng(11)
+    started = time.perf_counter()
+    # Touch the index once so it exists, then bulk-load random unit vectors as filler
+    cache.store("pptx", "warmup", ["warmup"])
+    index = cache._indexes["pptx"]
+    index._vectors = np.zeros((options.entries, options.dimensions), dtype=np.float32)
+    index._entries = [None] * options.entries
+    for start in range(0, filler, 100_000):
+        block = matrix_rng.standard_normal((min(100_000, filler - start), options.dimensions)).astype(np.float32)
+        block /= np.linalg.norm(block, axis=1, keepdims=True)
+        index._vectors[start : start + len(block)] = block
+    index._entries[:filler] = [(["filler"], None)] * filler
+    index._cursor = index._size = filler
+    for cached, _ in pairs:
+        cache.store("pptx", cached, [cached])
+    for cached, _ in NEAR_MISSES:
+        cache.store("pptx", cached, [cached])
+    print(
+        f"loaded {len(index)} entries x {options.dimensions} dims "
+        f"({index._vectors.nbytes / 2**20:.0f} MiB) in {time.perf_counter() - started:.1f}s"
+    )
+
+    timings = []
+    hits = wrong = 0
+    for cached, paraphrase in pairs:
+        started = time.perf_counter()
+        outline = cache.lookup("pptx", paraphrase)
+        timings.append((time.perf_counter() - started) * 1000)
+        if outline == [cached]:
+            hits += 1
+        elif outline is not None:
+            wrong += 1
+
+    false_hits = 0
+    miss_timings = []
+    unrelated = ["Volcano tourism outlook", "Quantum error correction primer", "Wedding catering menu"]
+    for topic in unrelated:
+        started = time.perf_counter()
+        false_hits += cache.lookup("pptx", topic) is not None
+        miss_timings.append((time.perf_counter() - started) * 1000)
+
+    entity_hits = [
+        (cached, probe) for cached, probe in NEAR_MISSES if cache.lookup("pptx", probe) == [cached]
+    ]
+
+    timings.sort()
+    print(f"threshold {options.threshold}")
+    print(f"paraphrase hit rate: {hits / len(pairs):.1%} ({wrong} returned a different topic's outline)")
+    print(f"unrelated topics served from cache: {false_hits}/{len(unrelated)}")
+    print(f"different-entity near misses served from cache: {len(entity_hits)}/{len(NEAR_MISSES)}")
+    for cached, probe in entity_hits:
+        print(f"  {probe!r} got the outline for {cached!r}")
+    print(
+        f"paraphrase lookup latency: p50 {statistics.median(timings):.2f} ms, "
+        f"p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms"
+    )
+    print(f"miss latency (full vector scan): p50 {statistics.median(miss_timings):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
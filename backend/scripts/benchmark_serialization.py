@@ -0,0 +1,125 @@
+"""
+Serialization benchmark for section list responses: the generic path (ORM objects ->
+FastAPI response_model validation -> JSONResponse) against the compact path in
+``app.responses`` (core row mappings -> one TypeAdapter call -> JSON bytes).
+
+Usage (from ``backend/``):
+    python scripts/benchmark_serialization.py [--sections 1000] [--repeat 50]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _time(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark section list serialization.")
+    parser.add_argument("--sections", type=int, default=1000)
+    parser.add_argument("--content-chars", type=int, default=1500)
+    parser.add_argument("--repeat", type=int, default=50)
+    options = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/serialization_bench.db"
+
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+    from sqlalchemy import insert, select
+    from starlette.requests import Request
+    from app import models, schemas
+    from app.database import SessionLocal, engine, init_db
+    from app.responses import compact_json_response, response_columns, section_list_adapter
+
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [{"id": 1, "email": "bench@example.com", "hashed_password": "x"}])
+        conn.execute(
+            insert(models.Project),
+            [{"id": 1, "user_id": 1, "title": "Bench", "document_type": "pptx", "main_topic": "Benchmark"}],
+        )
+        conn.execute(
+            insert(models.Section),
+            [
+                {
+                    "project_id": 1,
+                    "section_type": "slide",
+                    "title": f"Slide {idx}",
+                    "content": ("- Bullet point about the quarterly plan\n" * 40)[: options.content_chars],
+                    "order_index": idx,
+                }
+                for idx in range(options.sections)
+            ],
+        )
+
+    field = create_response_field(name="Response", type_=List[schemas.SectionResponse])
+    request = Request({"type": "http", "headers": [(b"accept-encoding", b"gzip")]})
+    plain_request = Request({"type": "http", "headers": []})
+    db = SessionLocal()
+
+    def generic_path():
+        db.expunge_all()
+        sections = (
+            db.query(models.Section)
+            .filter(models.Section.project_id == 1)
+            .order_by(models.Section.order_index.asc())
+            .all()
+        )
+        content = asyncio.run(serialize_response(field=field, response_content=sections))
+        return JSONResponse(content).body
+
+    def compact_query():
+        return db.execute(
+            select(*response_columns(models.Section, schemas.SectionResponse))
+            .where(models.Section.project_id == 1)
+            .order_by(models.Section.order_index.asc())
+        ).mappings()
+
+    def compact_path():
+        return compact_json_response(plain_request, section_list_adapter, compact_query()).body
+
+    def compact_gzip_path():
+        return compact_json_response(request, section_list_adapter, compact_query()).body
+
+    sections = db.query(models.Section).order_by(models.Section.order_index.asc()).all()
+    rows = [dict(row) for row in compact_query()]
+
+    def generic_serialize_only():
+        content = asyncio.run(serialize_response(field=field, response_content=sections))
+        return JSONResponse(content).body
+
+    def compact_serialize_only():
+        return section_list_adapter.dump_json(section_list_adapter.validate_python(rows))
+
+    per_1k = 1000 / options.sections
+    print(f"{options.sections} sections, ~{options.content_chars} chars of content each (ms per 1,000 sections)")
+    results = [
+        ("generic: serialize only", generic_serialize_only),
+        ("compact: serialize only", compact_serialize_only),
+        ("generic: query + serialize", generic_path),
+        ("compact: query + serialize", compact_path),
+        ("compact: query + serialize + gzip", compact_gzip_path),
+    ]
+    for label, fn in results:
+        fn()  # warm up
+        print(f"{label:>36}: {_time(fn, options.repeat) * per_1k:8.2f} ms   body {len(fn()) / 1024:8.1f} KiB")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Startup regression check: import ``app.main`` under ``-X importtime`` in a fresh interpreter,
+then drive the ASGI lifespan and a first ``/api/health`` request, and fail when either the
+time budget is exceeded or a heavy library is imported eagerly.
+
+Usage (from ``backend/``):
+    python scripts/check_startup.py [--import-budget-ms 1500] [--first-request-budget-ms 2500]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only needed once a document is exported, an LLM call is made or an outline is requested
+LAZY_MODULES = ("docx", "pptx", "openai", "numpy")
+
+FIRST_REQUEST_PROBE = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def main():
+    startup = asyncio.Queue()
+    await startup.put({"type": "lifespan.startup"})
+    lifespan_events = []
+
+    async def lifespan_send(message):
+        lifespan_events.append(message)
+
+    lifespan_task = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}}, startup.get, lifespan_send))
+    while not lifespan_events:
+        await asyncio.sleep(0)
+    assert lifespan_events[0]["type"] == "lifespan.startup.complete", lifespan_events
+
+    status = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/api/health", "raw_path": b"/api/health", "root_path": "",
+        "query_string": b"", "headers": [], "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 80),
+    }
+    await app(scope, receive, send)
+    await startup.put({"type": "lifespan.shutdown"})
+    await lifespan_task
+    return status["code"]
+
+code = asyncio.run(main())
+finished = time.perf_counter()
+print(json.dumps({
+    "status": code,
+    "import_ms": (imported - started) * 1000,
+    "first_request_ms": (finished - started) * 1000,
+    "lazy_modules_loaded": [name for name in %r if name in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+
+def _run(args, env):
+    return subprocess.run(
+        [sys.executable, *args], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+
+
+def measure_import_time(env) -> tuple[float, list[str]]:
+    """Return the cumulative import time of ``app.main`` in ms and any lazy modules it pulled in."""
+    result = _run(["-X", "importtime", "-c", "import app.main"], env)
+    total_us = 0
+    loaded = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        module = name.strip()
+        if module == "app.main":
+            total_us = int(cumulative.strip())
+        if module.split(".")[0] in LAZY_MODULES and module.split(".")[0] not in loaded:
+            loaded.append(module.split(".")[0])
+    return total_us / 1000, loaded
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--import-budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "1500")))
+    parser.add_argument(
+        "--first-request-budget-ms", type=float, default=float(os.getenv("FIRST_REQUEST_BUDGET_MS", "2500"))
+    )
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp}/startup_check.db")
+
+        import_ms, eager = measure_import_time(env)
+        probe = json.loads(_run(["-c", FIRST_REQUEST_PROBE], env).stdout.strip().splitlines()[-1])
+
+    failures = []
+    print(f"import app.main (-X importtime): {import_ms:.1f} ms (budget {options.import_budget_ms:.0f} ms)")
+    print(
+        f"time to first request: {probe['first_request_ms']:.1f} ms "
+        f"(budget {options.first_request_budget_ms:.0f} ms, status {probe['status']})"
+    )
+    if import_ms > options.import_budget_ms:
+        failures.append("import time budget exceeded")
+    if probe["first_request_ms"] > options.first_request_budget_ms:
+        failures.append("time-to-first-request budget exceeded")
+    if probe["status"] != 200:
+        failures.append(f"/api/health returned {probe['status']}")
+    eager = sorted(set(eager) | set(probe["lazy_modules_loaded"]))
+    if eager:
+        failures.append(f"heavy modules imported eagerly: {', '.join(eager)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())